@@ -65,6 +65,72 @@ def decrypt_file(input_file_path, output_file_path, password):
     with open(output_file_path, 'wb') as f:
         f.write(plaintext)
 
+# Streaming versions of the two functions above, for files too big to hold in memory.
+# Same file format (salt + IV + ciphertext), so either pair can decrypt the other's output.
+# Fixed-size chunks are read into one reused buffer and encrypted with update_into into
+# a second reused buffer, so memory use stays at about two chunks for any file size.
+# https://cryptography.io/en/latest/hazmat/primitives/symmetric-encryption/#cryptography.hazmat.primitives.ciphers.CipherContext.update_into
+CHUNK_SIZE = 1024 * 1024  # bytes per read, a multiple of the 16-byte AES block
+
+def _read_full(f, view):
+    # fill view from f, fewer bytes only at the end of the file
+    total = 0
+    while total < len(view):
+        count = f.readinto(view[total:])
+        if not count:
+            break
+        total += count
+    return total
+
+def _check_chunk_size(chunk_size):
+    # checked before any file is opened, so a bad chunk size never leaves a partial output file
+    if chunk_size < 16 or chunk_size % 16:
+        raise ValueError("chunk_size must be a positive multiple of the 16-byte AES block.")
+
+def _copy_through(context, f_in, f_out, chunk_size):
+    # CFB needs no padding: every chunk goes straight through the cipher
+    in_buffer = bytearray(chunk_size)
+    out_buffer = bytearray(chunk_size + 15)  # update_into wants block_size - 1 spare bytes
+    in_view, out_view = memoryview(in_buffer), memoryview(out_buffer)
+    while True:
+        count = _read_full(f_in, in_view)
+        if not count:
+            break
+        written = context.update_into(in_view[:count], out_buffer)
+        f_out.write(out_view[:written])
+    f_out.write(context.finalize())
+
+def encrypt_file_streaming(input_file_path, output_file_path, password, chunk_size=CHUNK_SIZE):
+    _check_chunk_size(chunk_size)
+    salt = os.urandom(16)
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    key = kdf.derive(password.encode())
+    iv = os.urandom(16)
+    encryptor = Cipher(algorithms.AES(key), modes.CFB(iv)).encryptor()
+    with open(input_file_path, 'rb') as f_in, open(output_file_path, 'wb') as f_out:
+        f_out.write(salt + iv)
+        _copy_through(encryptor, f_in, f_out, chunk_size)
+
+def decrypt_file_streaming(input_file_path, output_file_path, password, chunk_size=CHUNK_SIZE):
+    _check_chunk_size(chunk_size)
+    with open(input_file_path, 'rb') as f_in, open(output_file_path, 'wb') as f_out:
+        salt = f_in.read(16)
+        iv = f_in.read(16)
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=salt,
+            iterations=100000,
+        )
+        key = kdf.derive(password.encode())
+        decryptor = Cipher(algorithms.AES(key), modes.CFB(iv)).decryptor()
+        _copy_through(decryptor, f_in, f_out, chunk_size)
+
 # call encryption function
 #prints a line separator
 print('─' * 10) 
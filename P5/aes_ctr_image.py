@@ -1,6 +1,9 @@
 # make sure you have installed cryptography library
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
+from concurrent.futures import ThreadPoolExecutor
+import io
+import mmap
 import os
 import os.path
 
@@ -50,6 +53,143 @@ def decrypt_image(input_path, output_path, key):
 
     print("File decrypted successfully.")
 
+# Parallel versions of the two functions above, for multi-GB files.
+# CTR is seekable: the keystream for byte offset i comes from counter block nonce + i // 16,
+# so the file is cut into segments and each thread starts its own encryptor at its segment's
+# counter. The output is byte-identical to encrypt_image / decrypt_image with the same nonce.
+# cryptography releases the GIL while it encrypts, so plain threads use every core. Both files
+# are memory-mapped, so each thread reads its segment and writes it back in place.
+SEGMENT_SIZE = 16 * 1024 * 1024  # bytes per thread task (rounded up to a multiple of the 16-byte AES block)
+
+def _counter_block(nonce, offset):
+    # the CTR counter for byte 'offset': the nonce read as a 128-bit big-endian number, plus the block index
+    return ((int.from_bytes(nonce, "big") + offset // 16) % (1 << 128)).to_bytes(16, "big")
+
+def _ctr_segment(key, nonce, source, target, start, end):
+    cipher = Cipher(algorithms.AES(key), modes.CTR(_counter_block(nonce, start)), backend=default_backend())
+    target[start:end] = cipher.encryptor().update(source[start:end])
+
+def _ctr_parallel(key, nonce, source, target, segment_size, workers):
+    # encrypt (or decrypt, it is the same operation) source into target, one segment per task
+    if segment_size < 1:
+        raise ValueError(f"Invalid segment size {segment_size}")
+    # every segment must start on a block boundary, or its counter (offset // 16) would be wrong
+    segment_size = -(-segment_size // 16) * 16
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        tasks = [pool.submit(_ctr_segment, key, nonce, source, target, start, min(start + segment_size, len(source)))
+                 for start in range(0, len(source), segment_size)]
+        for task in tasks:
+            task.result()  # re-raises any error from a thread
+
+def encrypt_image_parallel(input_path, output_path, key, segment_size=SEGMENT_SIZE, workers=None):
+    nonce = os.urandom(16)
+    with open(os.path.join(BASE, input_path), "rb") as f_in, open(os.path.join(BASE, output_path), "w+b") as f_out:
+        size = os.fstat(f_in.fileno()).st_size
+        f_out.write(nonce)
+        if size:  # mmap cannot map an empty file
+            f_out.truncate(16 + size)
+            with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as source, \
+                    mmap.mmap(f_out.fileno(), 0) as target:
+                with memoryview(source) as source_view, memoryview(target) as target_view:
+                    _ctr_parallel(key, nonce, source_view, target_view[16:], segment_size, workers)
+
+    print("File encrypted successfully.")
+
+def decrypt_image_parallel(input_path, output_path, key, segment_size=SEGMENT_SIZE, workers=None):
+    with open(os.path.join(BASE, input_path), "rb") as f_in, open(os.path.join(BASE, output_path), "w+b") as f_out:
+        nonce = f_in.read(16)
+        size = os.fstat(f_in.fileno()).st_size - 16
+        if size > 0:
+            f_out.truncate(size)
+            with mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as source, \
+                    mmap.mmap(f_out.fileno(), 0) as target:
+                with memoryview(source) as source_view, memoryview(target) as target_view:
+                    _ctr_parallel(key, nonce, source_view[16:], target_view, segment_size, workers)
+
+    print("File decrypted successfully.")
+
+# Random access into an encrypted file (nonce + ciphertext, as written above).
+# Byte i of the ciphertext only depends on counter block nonce + i // 16, so any byte range
+# is decrypted on its own: start the counter at the first block the range touches and decrypt
+# just those blocks. The ciphertext is memory-mapped, so the rest of the file is never read.
+def _decrypt_range(key, nonce, ciphertext, offset, length):
+    # ciphertext is the mmap of the whole file, nonce included
+    size = len(ciphertext) - 16
+    start, end = min(offset, size), min(offset + length, size)
+    if end <= start:
+        return b""
+    skip = start % 16  # bytes of the first block before the range
+    cipher = Cipher(algorithms.AES(key), modes.CTR(_counter_block(nonce, start - skip)), backend=default_backend())
+    return cipher.decryptor().update(ciphertext[16 + start - skip:16 + end])[skip:]
+
+def read_range(path, offset, length, key):
+    # decrypt 'length' bytes of the original file starting at 'offset' (fewer at the end of the file)
+    with CTRFileReader(path, key) as f:
+        f.seek(offset)
+        return f.read(length)
+
+class CTRFileReader(io.RawIOBase):
+    # read-only, seekable file object over an encrypted file that decrypts only what is read, e.g.
+    #   with CTRFileReader('out/troll_encrypted.jpg', key) as f:
+    #       f.seek(2); marker = f.read(2)
+    def __init__(self, path, key):
+        super().__init__()
+        self._file = open(os.path.join(BASE, path), "rb")
+        if os.fstat(self._file.fileno()).st_size < 16:
+            self._file.close()
+            raise ValueError("Encrypted file is shorter than its 16-byte nonce.")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._nonce = self._map[:16]
+        self._key = key
+        self._position = 0
+        self.size = len(self._map) - 16  # size of the decrypted file
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if size is None or size < 0:
+            size = max(0, self.size - self._position)
+        data = _decrypt_range(self._key, self._nonce, self._map, self._position, size)
+        self._position += len(data)
+        return data
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+        super().close()
+
 # Generate a random AES key (AES-256)
 key = os.urandom(32)  # 32 bytes for AES-256
 
@@ -67,3 +207,15 @@ print('─' * 10)
 
 # Decrypt the image
 decrypt_image(encrypted_image_path, decrypted_image_path, key)
+
+# Check the parallel functions against the serial ones, with segment sizes that are not
+# a multiple of the AES block: each must decrypt what the other encrypted
+print('─' * 10)
+encrypt_image_parallel(input_image_path, 'out/troll_encrypted_parallel.jpg', key, segment_size=1000)
+decrypt_image('out/troll_encrypted_parallel.jpg', 'out/troll_decrypted_parallel.jpg', key)
+decrypt_image_parallel(encrypted_image_path, 'out/troll_decrypted_from_serial.jpg', key, segment_size=100)
+with open(os.path.join(BASE, input_image_path), "rb") as file:
+    original_data = file.read()
+for path in ('out/troll_decrypted_parallel.jpg', 'out/troll_decrypted_from_serial.jpg'):
+    with open(os.path.join(BASE, path), "rb") as file:
+        print(path, "matches the original:", file.read() == original_data)
@@ -0,0 +1,381 @@
+# make sure you have installed cryptography library
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives import hashes
+from concurrent.futures import ThreadPoolExecutor
+import io
+import mmap
+import os
+import os.path
+import struct
+
+#for making paths working on all OS
+BASE=os.path.dirname(os.path.abspath(__file__))
+
+# Segmented AES-GCM container: authenticated, streamable and randomly accessible.
+# The salt + iv + ciphertext files of aes_cbc_file.py / aes_cfb_file.py and the nonce + data
+# files of aes_ctr_image.py have no integrity check. Here the plaintext is cut into segments
+# that are sealed with AES-GCM one by one (the STREAM construction), so every segment is
+# verified on its own, as soon as it is read.
+#
+# File layout:
+#   header   magic, segment size, PBKDF2 salt, 7-byte nonce prefix                 (35 bytes)
+#   segment  AES-GCM ciphertext + 16-byte tag; segment_size bytes of plaintext each,
+#            except the last one, which can be shorter (or empty)
+#   trailer  the index: AES-GCM(segment count, plaintext size) + 16-byte tag      (32 bytes)
+#
+# Segment i is sealed with nonce = prefix + i (4 bytes) + last flag (1 byte), with the header as
+# associated data. So a segment cannot be reordered, dropped or taken from another file, and only
+# the real last segment opens with the last flag set: cutting the file anywhere is detected.
+# The trailer is sealed with flag 2. It gives the segment count and size without reading the
+# segments, and as all segments but the last have the same size, segment i is at a known offset.
+#
+# References:
+# - Hoang, Reyhanitabar, Rogaway & Vizar (2015). "Online Authenticated-Encryption and its
+#   Nonce-Reuse Misuse-Resistance" (the STREAM construction): https://eprint.iacr.org/2015/189
+# - cryptography.io AESGCM: https://cryptography.io/en/latest/hazmat/primitives/aead/
+
+MAGIC = b"P5AESGCM"
+HEADER = struct.Struct(">8sI16s7s")   # magic, segment size, salt, nonce prefix
+INDEX = struct.Struct(">QQ")          # segment count, plaintext size
+TAG_SIZE = 16
+TRAILER_SIZE = INDEX.size + TAG_SIZE
+SEGMENT_SIZE = 64 * 1024              # plaintext bytes per segment (the unit of random access)
+SEGMENTS_PER_TASK = 256               # segments sealed or opened per thread task
+MAX_SEGMENTS = 1 << 32                # the segment number is 4 bytes of the nonce
+
+# a key derivation function (PBKDF) derives the AES-256 key from the password and salt,
+# as in the other scripts of this folder
+def _derive_key(password, salt):
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return kdf.derive(password.encode())
+
+def _segment_nonce(prefix, index, last):
+    return prefix + struct.pack(">IB", index, 1 if last else 0)
+
+def _index_nonce(prefix):
+    return prefix + b"\xff\xff\xff\xff\x02"
+
+def _segment_count(size, segment_size):
+    # an empty file still has one (empty) last segment
+    return max(1, -(-size // segment_size))
+
+def _container_size(size, segment_size):
+    return HEADER.size + size + _segment_count(size, segment_size) * TAG_SIZE + TRAILER_SIZE
+
+def _new_header(password, segment_size):
+    if not 0 < segment_size < 1 << 32:
+        raise ValueError(f"Invalid segment size {segment_size}")
+    salt = os.urandom(16)
+    header = HEADER.pack(MAGIC, segment_size, salt, os.urandom(7))
+    return header, AESGCM(_derive_key(password, salt))
+
+def _read_header(header, password):
+    # (segment size, nonce prefix, AESGCM object) from the header bytes
+    if len(header) < HEADER.size:
+        raise ValueError("File is too short to be an AES-GCM container.")
+    magic, segment_size, salt, prefix = HEADER.unpack(header)
+    if magic != MAGIC or segment_size == 0:
+        raise ValueError("Not an AES-GCM container.")
+    return segment_size, prefix, AESGCM(_derive_key(password, salt))
+
+def _open(aead, nonce, data, header, what):
+    try:
+        return aead.decrypt(nonce, data, header)
+    except InvalidTag:
+        raise ValueError(f"{what} does not verify: wrong password, or the file was truncated or modified.") from None
+
+def _open_index(aead, header, trailer):
+    # (segment count, plaintext size) from the trailer, checked against the segment size
+    segment_count, size = INDEX.unpack(_open(aead, _index_nonce(header[-7:]), trailer, header, "Index"))
+    if segment_count != _segment_count(size, HEADER.unpack(header)[1]):
+        raise ValueError("Index does not match the segment size.")
+    return segment_count, size
+
+
+# ----- Whole files, in parallel -----
+# Every segment has its own nonce and tag, so segments are sealed and opened independently:
+# one thread task per SEGMENTS_PER_TASK segments, written in place into a memory-mapped
+# output. cryptography releases the GIL inside AESGCM, so the threads use every core.
+def _run_tasks(task, count, per_task, workers):
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        tasks = [pool.submit(task, first, min(first + per_task, count)) for first in range(0, count, per_task)]
+        for running in tasks:
+            running.result()  # re-raises any error from a thread
+
+def encrypt_file_gcm(input_file_path, output_file_path, password, segment_size=SEGMENT_SIZE, workers=None):
+    header, aead = _new_header(password, segment_size)
+    prefix = header[-7:]
+    with open(input_file_path, 'rb') as f_in, open(output_file_path, 'w+b') as f_out:
+        size = os.fstat(f_in.fileno()).st_size
+        segment_count = _segment_count(size, segment_size)
+        if segment_count > MAX_SEGMENTS:
+            raise ValueError("File has too many segments for this segment size.")
+        f_out.truncate(_container_size(size, segment_size))
+        source = mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) if size else b""  # mmap cannot map an empty file
+        try:
+            with mmap.mmap(f_out.fileno(), 0) as target:
+                target[:HEADER.size] = header
+
+                def seal(first, stop):
+                    for i in range(first, stop):
+                        start = i * segment_size
+                        sealed = aead.encrypt(_segment_nonce(prefix, i, i == segment_count - 1),
+                                              source[start:start + segment_size], header)
+                        offset = HEADER.size + i * (segment_size + TAG_SIZE)
+                        target[offset:offset + len(sealed)] = sealed
+
+                _run_tasks(seal, segment_count, SEGMENTS_PER_TASK, workers)
+                target[-TRAILER_SIZE:] = aead.encrypt(_index_nonce(prefix), INDEX.pack(segment_count, size), header)
+        finally:
+            if size:
+                source.close()
+
+def decrypt_file_gcm(input_file_path, output_file_path, password, workers=None):
+    # every segment is verified before it is written; if any segment fails, the output is removed
+    with open(input_file_path, 'rb') as f_in:
+        header = f_in.read(HEADER.size)
+        segment_size, prefix, aead = _read_header(header, password)
+        container_size = os.fstat(f_in.fileno()).st_size
+        if container_size < HEADER.size + TAG_SIZE + TRAILER_SIZE:
+            raise ValueError("File is truncated.")
+        f_in.seek(-TRAILER_SIZE, os.SEEK_END)
+        segment_count, size = _open_index(aead, header, f_in.read(TRAILER_SIZE))
+        if container_size != _container_size(size, segment_size):
+            raise ValueError("File is truncated or has extra data.")
+
+        try:
+            with open(output_file_path, 'w+b') as f_out, \
+                    mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as source:
+                f_out.truncate(size)
+                target = mmap.mmap(f_out.fileno(), 0) if size else None
+
+                def open_segments(first, stop):
+                    for i in range(first, stop):
+                        offset = HEADER.size + i * (segment_size + TAG_SIZE)
+                        last = i == segment_count - 1
+                        length = (size - i * segment_size if last else segment_size) + TAG_SIZE
+                        plaintext = _open(aead, _segment_nonce(prefix, i, last), source[offset:offset + length],
+                                          header, f"Segment {i}")
+                        if plaintext:  # there is no mapping for an empty output
+                            target[i * segment_size:i * segment_size + len(plaintext)] = plaintext
+
+                try:
+                    _run_tasks(open_segments, segment_count, SEGMENTS_PER_TASK, workers)
+                finally:
+                    if target is not None:
+                        target.close()
+        except BaseException:
+            os.remove(output_file_path)
+            raise
+
+
+# ----- Streaming -----
+class GCMWriter(io.RawIOBase):
+    # write-only file object that seals each segment as soon as it is full, e.g.
+    #   with GCMWriter('out/backup.gcm', password) as f:
+    #       for block in blocks:
+    #           f.write(block)
+    # Memory use is one segment. The last segment and the index are only written by close(),
+    # so if the with-block ends with an exception the file stays incomplete and will not open.
+    def __init__(self, path, password, segment_size=SEGMENT_SIZE):
+        super().__init__()
+        self._header, self._aead = _new_header(password, segment_size)
+        self._segment_size = segment_size
+        self._buffer = bytearray()
+        self._segments = 0
+        self._size = 0
+        self._file = open(os.path.join(BASE, path), "wb")
+        self._file.write(self._header)
+
+    def writable(self):
+        return True
+
+    def _seal(self, plaintext, last):
+        if self._segments >= MAX_SEGMENTS:
+            raise ValueError("Too many segments for this segment size.")
+        nonce = _segment_nonce(self._header[-7:], self._segments, last)
+        self._file.write(self._aead.encrypt(nonce, plaintext, self._header))
+        self._segments += 1
+        self._size += len(plaintext)
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        self._buffer += data
+        # a full segment is only sealed once more data follows, as it might be the last one
+        start = 0
+        with memoryview(self._buffer) as view:
+            while len(self._buffer) - start > self._segment_size:
+                self._seal(view[start:start + self._segment_size], last=False)
+                start += self._segment_size
+        del self._buffer[:start]
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._seal(bytes(self._buffer), last=True)
+                self._file.write(self._aead.encrypt(_index_nonce(self._header[-7:]),
+                                                    INDEX.pack(self._segments, self._size), self._header))
+            finally:
+                self._file.close()
+        super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and not self.closed:
+            self._file.close()  # leave the file without its last segment, so it cannot be opened
+            super().close()
+        else:
+            self.close()
+
+def decrypt_stream(f_in, password):
+    # yield the plaintext of each segment of an open container file, in order, after it is
+    # verified; reads sequentially, so f_in can be a pipe. Raises ValueError if the data was
+    # cut short, reordered or modified.
+    header = f_in.read(HEADER.size)
+    segment_size, prefix, aead = _read_header(header, password)
+    sealed_size = segment_size + TAG_SIZE
+
+    def read_up_to(count):
+        # like f_in.read(count), but keeps reading until count bytes or the end of the file
+        data = bytearray()
+        while len(data) < count:
+            chunk = f_in.read(count - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+
+    # keep one byte more than a full segment and the trailer: if it is there, the segment is not the last
+    buffer = read_up_to(sealed_size + TRAILER_SIZE + 1)
+    index, size = 0, 0
+    while len(buffer) > sealed_size + TRAILER_SIZE:
+        yield _open(aead, _segment_nonce(prefix, index, False), bytes(buffer[:sealed_size]), header, f"Segment {index}")
+        size += segment_size
+        index += 1
+        del buffer[:sealed_size]
+        buffer += read_up_to(sealed_size + TRAILER_SIZE + 1 - len(buffer))
+
+    if len(buffer) < TAG_SIZE + TRAILER_SIZE:
+        raise ValueError("File is truncated.")
+    last = _open(aead, _segment_nonce(prefix, index, True), bytes(buffer[:-TRAILER_SIZE]), header, f"Segment {index}")
+    if _open_index(aead, header, bytes(buffer[-TRAILER_SIZE:])) != (index + 1, size + len(last)):
+        raise ValueError("Index does not match the segments.")
+    yield last
+
+
+# ----- Random access -----
+class GCMFileReader(io.RawIOBase):
+    # read-only, seekable file object over a container that opens only the segments a read
+    # touches, e.g.
+    #   with GCMFileReader('out/customers_gcm', password) as f:
+    #       row = f.read_segment(3)
+    # The index is verified when the file is opened, so a truncated file is rejected up front.
+    def __init__(self, path, password):
+        super().__init__()
+        self._file = open(os.path.join(BASE, path), "rb")
+        try:
+            self._header = self._file.read(HEADER.size)
+            self._segment_size, self._prefix, self._aead = _read_header(self._header, password)
+            container_size = os.fstat(self._file.fileno()).st_size
+            if container_size < HEADER.size + TAG_SIZE + TRAILER_SIZE:
+                raise ValueError("File is truncated.")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        try:
+            self.segment_count, self.size = _open_index(self._aead, self._header, self._map[-TRAILER_SIZE:])
+            if container_size != _container_size(self.size, self._segment_size):
+                raise ValueError("File is truncated or has extra data.")
+        except BaseException:
+            self._map.close()
+            self._file.close()
+            raise
+        self._position = 0
+        self._cached = (None, b"")  # the last segment opened, for small sequential reads
+
+    def read_segment(self, index):
+        # plaintext of segment 'index', verified
+        if not 0 <= index < self.segment_count:
+            raise IndexError(f"Segment {index} out of range (0..{self.segment_count - 1})")
+        if self._cached[0] != index:
+            last = index == self.segment_count - 1
+            offset = HEADER.size + index * (self._segment_size + TAG_SIZE)
+            length = (self.size - index * self._segment_size if last else self._segment_size) + TAG_SIZE
+            plaintext = _open(self._aead, _segment_nonce(self._prefix, index, last),
+                              self._map[offset:offset + length], self._header, f"Segment {index}")
+            self._cached = (index, plaintext)
+        return self._cached[1]
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        end = self.size if size is None or size < 0 else min(self.size, self._position + size)
+        parts = []
+        while self._position < end:
+            index, skip = divmod(self._position, self._segment_size)
+            part = self.read_segment(index)[skip:skip + end - self._position]
+            parts.append(part)
+            self._position += len(part)
+        return b"".join(parts)
+
+    def readall(self):
+        return self.read()
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._map.close()
+            self._file.close()
+        super().close()
+
+
+if __name__ == "__main__":
+    print('─' * 10)
+    encrypt_file_gcm(BASE + '/in/customers.csv', BASE + '/out/customers_gcm', 'p@33w0rd')
+    print("Look out for the encrypted file inside out sub-directory")
+
+    print('─' * 10)
+    decrypt_file_gcm(BASE + '/out/customers_gcm', BASE + '/out/customers_gcm_decrypted', 'p@33w0rd')
+    print("Now look at the decrypted file inside out sub-directory")
+
+    print('─' * 10)
+    with GCMFileReader(BASE + '/out/customers_gcm', 'p@33w0rd') as f:
+        print(f"{f.size} bytes in {f.segment_count} segment(s); the first line:")
+        print(f.read(200).split(b"\n")[0].decode())
+    print('─' * 10)
@@ -67,6 +67,103 @@ def decrypt_file(input_file_path, output_file_path, password):
     with open(output_file_path, 'wb') as f:
         f.write(plaintext)
 
+# Streaming versions of the two functions above, for files too big to hold in memory.
+# Same file format (salt + IV + ciphertext), so either pair can decrypt the other's output.
+# Fixed-size chunks are read into one reused buffer and encrypted with update_into into
+# a second reused buffer, so memory use stays at about two chunks for any file size.
+# https://cryptography.io/en/latest/hazmat/primitives/symmetric-encryption/#cryptography.hazmat.primitives.ciphers.CipherContext.update_into
+CHUNK_SIZE = 1024 * 1024  # bytes per read, a multiple of the 16-byte AES block
+
+def _read_full(f, view):
+    # fill view from f, fewer bytes only at the end of the file
+    total = 0
+    while total < len(view):
+        count = f.readinto(view[total:])
+        if not count:
+            break
+        total += count
+    return total
+
+def _check_chunk_size(chunk_size):
+    # checked before any file is opened, so a bad chunk size never leaves a partial output file
+    if chunk_size < 16 or chunk_size % 16:
+        raise ValueError("chunk_size must be a positive multiple of the 16-byte AES block.")
+
+def encrypt_file_streaming(input_file_path, output_file_path, password, chunk_size=CHUNK_SIZE):
+    _check_chunk_size(chunk_size)
+    salt = os.urandom(16)
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    key = kdf.derive(password.encode())
+    iv = os.urandom(16)
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()
+
+    # the input buffer has one spare block for the PKCS7 padding of the last chunk,
+    # the output buffer the block_size - 1 extra bytes update_into asks for
+    in_buffer = bytearray(chunk_size + 16)
+    out_buffer = bytearray(chunk_size + 16 + 15)
+    in_view, out_view = memoryview(in_buffer), memoryview(out_buffer)
+    with open(input_file_path, 'rb') as f_in, open(output_file_path, 'wb') as f_out:
+        f_out.write(salt + iv)
+        while True:
+            count = _read_full(f_in, in_view[:chunk_size])
+            if count < chunk_size:
+                # last chunk: PKCS7 padding is added in place (a full block if count is a multiple of 16)
+                pad = 16 - count % 16
+                in_buffer[count:count + pad] = bytes([pad]) * pad
+                written = encryptor.update_into(in_view[:count + pad], out_buffer)
+                f_out.write(out_view[:written])
+                break
+            written = encryptor.update_into(in_view[:chunk_size], out_buffer)
+            f_out.write(out_view[:written])
+        f_out.write(encryptor.finalize())
+
+def decrypt_file_streaming(input_file_path, output_file_path, password, chunk_size=CHUNK_SIZE):
+    _check_chunk_size(chunk_size)
+    try:
+        with open(input_file_path, 'rb') as f_in, open(output_file_path, 'wb') as f_out:
+            salt = f_in.read(16)
+            iv = f_in.read(16)
+            kdf = PBKDF2HMAC(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=salt,
+                iterations=100000,
+            )
+            key = kdf.derive(password.encode())
+            decryptor = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor()
+
+            in_buffer = bytearray(chunk_size)
+            out_buffer = bytearray(chunk_size + 15)
+            in_view, out_view = memoryview(in_buffer), memoryview(out_buffer)
+            # the last plaintext block is held back until we know it is the final one,
+            # because only that block carries the padding
+            last_block = b''
+            while True:
+                count = _read_full(f_in, in_view)
+                if not count:
+                    break
+                written = decryptor.update_into(in_view[:count], out_buffer)
+                if written:
+                    f_out.write(last_block)
+                    f_out.write(out_view[:written - 16])
+                    last_block = bytes(out_view[written - 16:written])
+            decryptor.finalize()  # raises ValueError if the ciphertext is not whole blocks
+
+            # strip the PKCS7 padding, with the same check the unpadder does
+            pad = last_block[-1] if last_block else 0
+            if not 1 <= pad <= 16 or last_block[-pad:] != bytes([pad]) * pad:
+                raise ValueError("Invalid padding bytes.")
+            f_out.write(last_block[:-pad])
+    except ValueError:
+        # wrong password or damaged file: don't leave the half-written plaintext behind
+        os.remove(output_file_path)
+        raise
+
 # call encryption function
 #prints a line separator
 print('─' * 10) 
@@ -39,10 +39,20 @@ Please note that while I have adapted and learned from these sources, the code p
 =====================================
 """
 
+import bisect
+import math
+import multiprocessing
+import os
+import queue
 import random
 
+try:
+    import numpy as np  # only needed for is_prime_batch
+except ImportError:
+    np = None
+
 # Efficient modular exponentiation adapted from GeeksforGeeks, reference above
-def modular_exponentiation(base, exponent, modulus):
+def square_and_multiply_exponentiation(base, exponent, modulus):
     """
     Compute (base^exponent) % modulus efficiently using the square-and-multiply method.
 
@@ -63,25 +73,200 @@ def modular_exponentiation(base, exponent, modulus):
     return result
 
 
+# Pick the sliding window width from the exponent size (bigger exponents amortise a bigger table)
+def window_width_for_exponent(exponent_bits):
+    for max_bits, width in ((24, 1), (80, 3), (240, 4), (672, 5), (1792, 6)):
+        if exponent_bits <= max_bits:
+            return width
+    return 7
+
+
+def _sliding_window_power(base, exponent, multiply, one):
+    """
+    Left-to-right sliding-window exponentiation over any 'multiply' (plain or Montgomery).
+
+    Method:
+    1. Precompute the odd powers base^1, base^3, ..., base^(2^w - 1)
+    2. Scan the exponent from the top bit down:
+       - a 0 bit costs one squaring
+       - otherwise take the longest window of <= w bits that ends in a 1,
+         square once per bit in it, then multiply by the matching odd power
+    This replaces about half of the multiplications of square-and-multiply
+    with table lookups (roughly exponent_bits / (w + 1) multiplications in total).
+    """
+    width = window_width_for_exponent(exponent.bit_length())
+    base_squared = multiply(base, base)
+    odd_powers = [base]
+    for _ in range((1 << (width - 1)) - 1):
+        odd_powers.append(multiply(odd_powers[-1], base_squared))
+
+    result = one
+    bit_index = exponent.bit_length() - 1
+    while bit_index >= 0:
+        if not (exponent >> bit_index) & 1:
+            result = multiply(result, result)
+            bit_index -= 1
+            continue
+        # Longest window [bit_index .. window_end] of at most 'width' bits that ends in a 1
+        window_end = max(bit_index - width + 1, 0)
+        while not (exponent >> window_end) & 1:
+            window_end += 1
+        window_length = bit_index - window_end + 1
+        window_value = (exponent >> window_end) & ((1 << window_length) - 1)
+        for _ in range(window_length):
+            result = multiply(result, result)
+        result = multiply(result, odd_powers[window_value >> 1])
+        bit_index = window_end - 1
+    return result
+
+
+# Sliding-window (k-ary) exponentiation with ordinary % reduction
+def sliding_window_exponentiation(base, exponent, modulus):
+    """Compute (base^exponent) % modulus with the sliding-window method."""
+    return _sliding_window_power(base % modulus, exponent,
+                                 lambda x, y: (x * y) % modulus, 1 % modulus)
+
+
+# Montgomery reduction constants, computed once per (odd) modulus and reused
+class MontgomeryContext:
+    """
+    Precomputed constants for Montgomery multiplication modulo an odd 'modulus'.
+
+    With R = 2^k > modulus, numbers are kept in the form a*R mod modulus. The
+    product of two such numbers is reduced (REDC) with shifts and masks instead
+    of a division by modulus:
+        REDC(T) = (T + ((T mod R) * n' mod R) * modulus) / R,  where n' = -modulus^-1 mod R
+
+    Note: this is not a speed-up in Python. Python's big-int % is already implemented in C,
+    and each REDC step costs two extra multiplications done as Python objects. In
+    testing/modexp_benchmark.py the montgomery backend ran at 0.65x-1.05x the speed of
+    square-and-multiply at 512-2048 bits, depending on the run, and always behind
+    sliding_window. It is kept to show the technique; use sliding_window (the default)
+    or builtin for speed.
+    """
+
+    def __init__(self, modulus):
+        if modulus % 2 == 0:
+            raise ValueError("Montgomery form needs an odd modulus")
+        self.modulus = modulus
+        self.shift = modulus.bit_length()
+        self.mask = (1 << self.shift) - 1
+        # modulus^-1 mod R by Newton/Hensel lifting: each step doubles the correct low bits
+        inverse = 1
+        for _ in range(self.shift.bit_length()):
+            inverse = (inverse * (2 - modulus * inverse)) & self.mask
+        self.n_prime = (-inverse) & self.mask
+        self.r_squared = (1 << (2 * self.shift)) % modulus
+
+    def reduce(self, t):
+        m = ((t & self.mask) * self.n_prime) & self.mask
+        t = (t + m * self.modulus) >> self.shift
+        return t - self.modulus if t >= self.modulus else t
+
+    def multiply(self, x, y):
+        return self.reduce(x * y)
+
+    def to_montgomery(self, x):
+        return self.reduce((x % self.modulus) * self.r_squared)
+
+    def from_montgomery(self, x):
+        return self.reduce(x)
+
+
+_montgomery_contexts = {}
+MONTGOMERY_CACHE_SIZE = 64  # moduli remembered at once (Miller-Rabin reuses one modulus per round)
+
+def montgomery_context(modulus):
+    """Return the cached MontgomeryContext for 'modulus', building it if needed."""
+    context = _montgomery_contexts.get(modulus)
+    if context is None:
+        if len(_montgomery_contexts) >= MONTGOMERY_CACHE_SIZE:
+            _montgomery_contexts.pop(next(iter(_montgomery_contexts)))  # drop the oldest
+        context = _montgomery_contexts[modulus] = MontgomeryContext(modulus)
+    return context
+
+
+# Sliding-window exponentiation carried out in Montgomery form
+def montgomery_exponentiation(base, exponent, modulus):
+    """
+    Compute (base^exponent) % modulus for odd modulus using Montgomery multiplication.
+    Slower than sliding_window_exponentiation in Python (see MontgomeryContext).
+    """
+    context = montgomery_context(modulus)
+    result = _sliding_window_power(context.to_montgomery(base), exponent,
+                                   context.multiply, context.to_montgomery(1))
+    return context.from_montgomery(result)
+
+
+# Python's own three-argument pow (C implementation)
+def builtin_exponentiation(base, exponent, modulus):
+    return pow(base, exponent, modulus)
+
+
+# Available backends for modular_exponentiation.
+# Fastest first: builtin, then sliding_window (the default for the manual code path);
+# montgomery is slower than sliding_window here and only kept for comparison.
+EXPONENTIATION_BACKENDS = {
+    "square_and_multiply": square_and_multiply_exponentiation,
+    "sliding_window": sliding_window_exponentiation,
+    "montgomery": montgomery_exponentiation,
+    "builtin": builtin_exponentiation,
+}
+_exponentiation_backend = "sliding_window"
+
+
+def set_exponentiation_backend(name):
+    """
+    Choose which backend modular_exponentiation uses (a key of EXPONENTIATION_BACKENDS).
+    Returns the previously selected backend name so callers can restore it.
+    """
+    global _exponentiation_backend
+    if name not in EXPONENTIATION_BACKENDS:
+        raise ValueError("Unknown exponentiation backend: " + str(name))
+    previous = _exponentiation_backend
+    _exponentiation_backend = name
+    return previous
+
+
+def get_exponentiation_backend():
+    return _exponentiation_backend
+
+
+# Modular exponentiation through the selected backend
+def modular_exponentiation(base, exponent, modulus):
+    """
+    Compute (base^exponent) % modulus with the currently selected backend.
+
+    Falls back to the built-in pow for inputs a backend does not handle:
+    negative exponents (modular inverses), modulus <= 1, and even moduli
+    for the Montgomery backend.
+    """
+    if exponent < 0 or modulus <= 1 or (modulus % 2 == 0 and _exponentiation_backend == "montgomery"):
+        return pow(base, exponent, modulus)
+    return EXPONENTIATION_BACKENDS[_exponentiation_backend](base, exponent, modulus)
+
+
 # Single round of Miller-Rabin test
-def miller_rabin_single_test(odd_factor_d, number_to_test):
+def miller_rabin_single_test(odd_factor_d, number_to_test, base_a=None):
     """
     Perform one probabilistic test for primality using Miller-Rabin.
 
     Inputs:
     - number_to_test: integer to check
     - odd_factor_d: odd factor of number_to_test-1 (so that number_to_test-1 = odd_factor_d * 2^r)
+    - base_a: fixed base to test with (None = pick a random base)
 
     Procedure:
-    1. Randomly select a base a in [2, number_to_test-2]
+    1. Randomly select a base a in [2, number_to_test-2] (unless base_a is given)
     2. Compute x = a^odd_factor_d % number_to_test
     3. If x == 1 or x == number_to_test-1, number passes this round
     4. Otherwise, repeatedly square x (x = x^2 % number_to_test) and double odd_factor_d:
        - If x becomes number_to_test-1, number passes this round
        - If x becomes 1 before number_to_test-1, number is composite
     """
-    random_base_a = 2 + random.randint(1, number_to_test - 4)
-    x_value = modular_exponentiation(random_base_a, odd_factor_d, number_to_test)
+    if base_a is None:
+        base_a = 2 + random.randint(1, number_to_test - 4)
+    x_value = modular_exponentiation(base_a, odd_factor_d, number_to_test)
 
     if x_value == 1 or x_value == number_to_test - 1:
         return True
@@ -97,14 +282,177 @@ def miller_rabin_single_test(odd_factor_d, number_to_test):
     return False  # definitely composite
 
 
+# Minimum Miller-Rabin rounds for random candidates, after FIPS 186-5 Table B.1
+# (the 512-bit row follows FIPS 186-4 Table C.3, which 186-5 no longer lists)
+# Each row: (minimum bit length, rounds M-R only, rounds when a Lucas test is also run)
+FIPS_MILLER_RABIN_ROUNDS = [
+    (2048, 4, 2),
+    (1536, 4, 3),
+    (1024, 5, 4),
+    (512, 7, 5),
+]
+
+
+def miller_rabin_rounds_for_bits(bit_length, with_lucas=False):
+    """
+    Look up how many random-base Miller-Rabin rounds a candidate of 'bit_length' bits needs.
+
+    Notes:
+    - The FIPS bounds only hold for randomly generated candidates (as in
+      generate_large_prime), not for numbers chosen by an adversary
+    - Sizes below the table fall back to the original flat 40 rounds
+    """
+    for min_bits, rounds_mr_only, rounds_with_lucas in FIPS_MILLER_RABIN_ROUNDS:
+        if bit_length >= min_bits:
+            return rounds_with_lucas if with_lucas else rounds_mr_only
+    return 40
+
+
+# Jacobi symbol (a/n) for odd n, needed to pick the Lucas parameters
+def jacobi_symbol(a, n):
+    """
+    Compute the Jacobi symbol (a/n) for odd n > 0 using quadratic reciprocity.
+    Returns 1, -1 or 0 (when gcd(a, n) > 1).
+    """
+    a %= n
+    result = 1
+    while a != 0:
+        while a % 2 == 0:  # pull out factors of 2: (2/n) = -1 when n ≡ 3, 5 (mod 8)
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a  # reciprocity flips the sign when both are ≡ 3 (mod 4)
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+# Strong Lucas probable-prime test (second half of Baillie-PSW)
+def lucas_strong_probable_prime(number_to_test):
+    """
+    Run the strong Lucas probable-prime test on an odd number_to_test > 2.
+
+    Method (Selfridge "method A"):
+    1. Reject perfect squares (no suitable D exists for them)
+    2. Find the first D in 5, -7, 9, -11, ... with Jacobi(D/n) = -1
+    3. With P = 1, Q = (1 - D)/4, write n+1 = d * 2^s and compute U_d, V_d
+       by doubling (U_2k = U_k*V_k, V_2k = V_k^2 - 2Q^k) and incrementing
+    4. n passes if U_d ≡ 0 or V_(d*2^r) ≡ 0 for some 0 <= r < s
+
+    No composite is known that passes both this and a base-2 strong test.
+    """
+    n = number_to_test
+    if math.isqrt(n) ** 2 == n:
+        return False
+
+    discriminant_d = 5
+    while True:
+        j = jacobi_symbol(discriminant_d, n)
+        if j == -1:
+            break
+        if j == 0 and abs(discriminant_d) != n:
+            return False  # discriminant shares a factor with n
+        discriminant_d = -discriminant_d - 2 if discriminant_d > 0 else -discriminant_d + 2
+
+    p_param = 1
+    q_param = (1 - discriminant_d) // 4
+
+    odd_factor_d = n + 1
+    s = 0
+    while odd_factor_d % 2 == 0:
+        odd_factor_d //= 2
+        s += 1
+
+    def half(x):
+        # x/2 mod n, n is odd so x + n is even whenever x is odd
+        if x & 1:
+            x += n
+        return (x // 2) % n
+
+    # Left-to-right binary walk over the bits of odd_factor_d, starting from k = 1
+    u_value, v_value, q_power = 1, p_param, q_param % n
+    for bit in bin(odd_factor_d)[3:]:
+        u_value = (u_value * v_value) % n
+        v_value = (v_value * v_value - 2 * q_power) % n
+        q_power = (q_power * q_power) % n
+        if bit == "1":
+            u_value, v_value = (half(p_param * u_value + v_value),
+                                half(discriminant_d * u_value + p_param * v_value))
+            q_power = (q_power * q_param) % n
+
+    if u_value == 0 or v_value == 0:
+        return True
+    for _ in range(s - 1):
+        v_value = (v_value * v_value - 2 * q_power) % n
+        q_power = (q_power * q_power) % n
+        if v_value == 0:
+            return True
+    return False
+
+
+# Known witness sets that make Miller-Rabin exact below each bound
+# (Pomerance, Selfridge & Wagstaff; Jaeschke; Feitsma & Galway's base-2 pseudoprime list)
+# Each row: (exclusive upper bound, bases)
+DETERMINISTIC_WITNESSES = [
+    (2047, (2,)),
+    (1373653, (2, 3)),
+    (25326001, (2, 3, 5)),
+    (3215031751, (2, 3, 5, 7)),
+    (2152302898747, (2, 3, 5, 7, 11)),
+    (3474749660383, (2, 3, 5, 7, 11, 13)),
+    (341550071728321, (2, 3, 5, 7, 11, 13, 17)),
+    (3825123056546413051, (2, 3, 5, 7, 11, 13, 17, 19, 23)),
+    (1 << 64, (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)),
+]
+DETERMINISTIC_LIMIT = 1 << 64
+
+
+# Deterministic Miller-Rabin for 64-bit and smaller inputs
+def is_prime_deterministic(candidate_number):
+    """
+    Exact primality test for 0 <= candidate_number < 2^64.
+
+    Rationale:
+    - Below 2^64 it is known which fixed bases catch every composite, so no
+      random rounds (and no random.randint calls) are needed
+    - Smaller numbers need fewer bases, e.g. just 2 and 3 below 1,373,653
+    """
+    if candidate_number >= DETERMINISTIC_LIMIT:
+        raise ValueError("is_prime_deterministic only supports numbers below 2^64")
+    if candidate_number < 2:
+        return False
+    for small_prime in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if candidate_number % small_prime == 0:
+            return candidate_number == small_prime
+
+    odd_factor_d = candidate_number - 1
+    while odd_factor_d % 2 == 0:
+        odd_factor_d //= 2
+
+    for bound, bases in DETERMINISTIC_WITNESSES:
+        if candidate_number < bound:
+            break
+    for base_a in bases:
+        if not miller_rabin_single_test(odd_factor_d, candidate_number, base_a=base_a):
+            return False
+    return True
+
+
 # Full Miller-Rabin primality check
-def is_probable_prime(candidate_number, number_of_rounds=40):
+def is_probable_prime(candidate_number, number_of_rounds=40, mode="random"):
     """
     Check if a number is probably prime using multiple rounds of Miller-Rabin.
 
     Parameters:
     - candidate_number: integer to test
     - number_of_rounds: number of independent Miller-Rabin tests (higher = more confidence)
+    - mode:
+      - "random": number_of_rounds random-base rounds (original behaviour)
+      - "fips":   one base-2 round first, then the FIPS 186-5 number of random rounds
+      - "bpsw":   base-2 round plus a strong Lucas test (Baillie-PSW), then the
+                  (smaller) FIPS 186-5 number of random rounds for M-R + Lucas
+      In "fips" and "bpsw" mode the table replaces number_of_rounds.
 
     Returns:
     - True if candidate_number is likely prime
@@ -114,17 +462,32 @@ def is_probable_prime(candidate_number, number_of_rounds=40):
     - Any odd number > 2 can be expressed as candidate_number-1 = odd_factor_d * 2^r
     - Miller-Rabin theorem: a number passes if a^odd_factor_d ≡ 1 or a^(odd_factor_d*2^j) ≡ -1 (mod candidate_number)
     - Probability of error after number_of_rounds tests ≈ (1/4)^number_of_rounds
+    - The fixed base-2 round means almost every composite is rejected after a single
+      exponentiation, before any random base is drawn
+    - Numbers below 2^64 always take the exact is_prime_deterministic path
     """
     if candidate_number <= 1 or candidate_number == 4:
         return False
     if candidate_number <= 3:
         return True
+    if candidate_number < DETERMINISTIC_LIMIT:
+        return is_prime_deterministic(candidate_number)
 
     # Factor out powers of 2 from candidate_number-1
     odd_factor_d = candidate_number - 1
     while odd_factor_d % 2 == 0:
         odd_factor_d //= 2
 
+    if mode in ("fips", "bpsw"):
+        if not miller_rabin_single_test(odd_factor_d, candidate_number, base_a=2):
+            return False
+        with_lucas = mode == "bpsw"
+        if with_lucas and not lucas_strong_probable_prime(candidate_number):
+            return False
+        number_of_rounds = miller_rabin_rounds_for_bits(candidate_number.bit_length(), with_lucas)
+    elif mode != "random":
+        raise ValueError("Unknown primality test mode: " + str(mode))
+
     # Perform multiple independent Miller-Rabin rounds
     for _ in range(number_of_rounds):
         if not miller_rabin_single_test(odd_factor_d, candidate_number):
@@ -132,21 +495,253 @@ def is_probable_prime(candidate_number, number_of_rounds=40):
     return True
 
 
+# Default sizes for the small-prime sieve used by generate_large_prime
+SIEVE_PRIME_LIMIT = 2000     # trial-divide candidates by every prime below this bound
+SIEVE_WINDOW_SIZE = 4096     # number of odd offsets sieved from one random start
+
+
+# Table of small primes, built once per limit with a simple Sieve of Eratosthenes
+_small_prime_tables = {}
+
+def small_primes_below(limit):
+    """
+    Return a list of all primes p with 2 <= p < limit.
+
+    The tables are cached, so repeated key generation only pays for the sieve
+    once. Only power-of-two limits are sieved and stored (any other limit is a
+    slice of the next one up), so callers passing a different limit each time
+    (e.g. isqrt(n) + 1) cannot grow the cache without bound.
+    """
+    table_limit = 1 << max(limit - 1, 1).bit_length()  # next power of two >= limit
+    if table_limit not in _small_prime_tables:
+        is_prime_flags = bytearray([1]) * table_limit
+        is_prime_flags[0] = is_prime_flags[1] = 0
+        for i in range(2, math.isqrt(table_limit - 1) + 1):
+            if is_prime_flags[i]:
+                is_prime_flags[i * i::i] = bytes(len(range(i * i, table_limit, i)))
+        _small_prime_tables[table_limit] = [i for i in range(table_limit) if is_prime_flags[i]]
+    table = _small_prime_tables[table_limit]
+    if limit == table_limit:
+        return table
+    return table[:bisect.bisect_left(table, limit)]
+
+
+# Sieve a window of odd candidates starting from one random point
+def sieve_candidate_window(start, window_size, small_primes):
+    """
+    Yield the candidates start, start+2, ..., start+2*(window_size-1) that are
+    not divisible by any of 'small_primes'.
+
+    Rationale:
+    - Roughly 90% of random odd numbers have a factor below 2000, and each of
+      those would otherwise cost a full Miller-Rabin exponentiation
+    - start + 2k is divisible by p exactly when k ≡ -start * 2^(-1) (mod p),
+      so every multiple of p in the window can be crossed off with one slice
+    """
+    survivors = bytearray([1]) * window_size
+    for p in small_primes[1:]:  # skip 2, every candidate is already odd
+        first_offset = (-start % p) * ((p + 1) // 2) % p  # (p+1)/2 is the inverse of 2 mod p
+        survivors[first_offset::p] = bytes(len(range(first_offset, window_size, p)))
+    for offset in range(window_size):
+        if survivors[offset]:
+            yield start + 2 * offset
+
+
+# All primes in a range, e.g. the neighbourhood of a student ID
+def primes_in_range(lo, hi, sieve_limit=SIEVE_PRIME_LIMIT):
+    """
+    Return a sorted list of every prime p with lo <= p < hi.
+
+    Method:
+    1. Primes below 'sieve_limit' come straight from the small-prime table
+    2. The rest of the range is sieved in one window of odd numbers (see sieve_candidate_window)
+    3. Survivors below sieve_limit^2 are prime already; larger ones go through
+       is_prime_deterministic (or is_probable_prime beyond 2^64)
+    """
+    sieve_limit = max(sieve_limit, 3)  # the table must hold 2: the window below only has odd numbers
+    small_primes = small_primes_below(sieve_limit)
+    primes = [p for p in small_primes if lo <= p < hi]
+
+    start = max(lo, sieve_limit) | 1  # first odd number not covered by the table
+    if start < hi:
+        window_size = (hi - start + 1) // 2
+        for candidate in sieve_candidate_window(start, window_size, small_primes):
+            if candidate < sieve_limit * sieve_limit:
+                primes.append(candidate)
+            elif candidate < DETERMINISTIC_LIMIT:
+                if is_prime_deterministic(candidate):
+                    primes.append(candidate)
+            elif is_probable_prime(candidate, mode="bpsw"):
+                primes.append(candidate)
+    return primes
+
+
+# ----- Batch primality testing with NumPy -----
+BATCH_SEGMENT_SIZE = 1 << 18        # numbers sieved per segment when the input is a range
+BATCH_RANGE_SIEVE_LIMIT = 1 << 20   # largest sieving prime used for ranges
+VECTORISED_MR_LIMIT = 1 << 32       # vectorised MR bound: n^2 must fit in uint64 (bases 2, 7, 61 are exact up to 4759123141)
+VECTORISED_MR_BASES = (2, 7, 61)
+
+
+def _vectorised_power_mod(base_values, exponents, moduli):
+    """Element-wise base^exponent mod modulus for uint64 arrays with moduli < 2^32 (products fit in 64 bits)."""
+    result = np.ones_like(moduli)
+    base_values = base_values % moduli
+    exponents = exponents.copy()
+    while exponents.any():
+        odd = (exponents & np.uint64(1)).astype(bool)
+        result = np.where(odd, (result * base_values) % moduli, result)
+        base_values = (base_values * base_values) % moduli
+        exponents >>= np.uint64(1)
+    return result
+
+
+def _vectorised_miller_rabin(values):
+    """
+    Deterministic Miller-Rabin (bases 2, 7, 61) on a uint64 array of odd values in (61, 2^32).
+    Every element runs the same sequence of squarings; elements that already
+    passed a base simply ignore the remaining steps.
+    """
+    odd_parts = values - np.uint64(1)
+    twos = np.zeros_like(values)
+    even = (odd_parts & np.uint64(1)) == 0
+    while even.any():
+        odd_parts = np.where(even, odd_parts >> np.uint64(1), odd_parts)
+        twos += even
+        even = (odd_parts & np.uint64(1)) == 0
+
+    minus_one = values - np.uint64(1)
+    probably_prime = np.ones(values.shape, dtype=bool)
+    for base_a in VECTORISED_MR_BASES:
+        x_values = _vectorised_power_mod(np.full_like(values, base_a), odd_parts, values)
+        passed = (x_values == 1) | (x_values == minus_one)
+        for r in range(1, int(twos.max())):
+            x_values = (x_values * x_values) % values
+            passed |= (x_values == minus_one) & (np.uint64(r) < twos)
+        probably_prime &= passed
+    return probably_prime
+
+
+def _segmented_sieve_mask(lo, hi, sieve_primes):
+    """Boolean mask for range(lo, hi): False where a number has a factor in sieve_primes (other than itself)."""
+    mask = np.ones(hi - lo, dtype=bool)
+    mask[:max(0, min(2, hi) - lo)] = False  # 0 and 1 are not prime
+    for segment_lo in range(lo, hi, BATCH_SEGMENT_SIZE):
+        segment_hi = min(segment_lo + BATCH_SEGMENT_SIZE, hi)
+        segment = mask[segment_lo - lo:segment_hi - lo]  # a view, marks go straight into mask
+        for p in sieve_primes:
+            if p * p >= segment_hi:
+                break
+            first_multiple = max(p * p, (segment_lo + p - 1) // p * p)
+            segment[first_multiple - segment_lo::p] = False
+    return mask
+
+
+def is_prime_batch(candidates, sieve_limit=SIEVE_PRIME_LIMIT):
+    """
+    Test many numbers at once and return a NumPy boolean mask (True = prime).
+
+    Method:
+    1. Remove small-prime multiples:
+       - a range(lo, hi) is sieved segment by segment (slice assignment per prime,
+         using primes up to sqrt(hi), capped at BATCH_RANGE_SIEVE_LIMIT)
+       - any other array is checked against the primes below sieve_limit with vectorised %
+    2. Survivors below the square of the largest sieving prime are prime already
+    3. Survivors below 2^32 get a vectorised deterministic Miller-Rabin (bases 2, 7, 61)
+    4. Anything larger falls back to is_probable_prime one element at a time
+
+    Parameters:
+    - candidates: range with step 1, list or NumPy integer array
+    - sieve_limit: small-prime bound for step 1 on non-range input
+    """
+    if np is None:
+        raise ImportError("is_prime_batch needs NumPy: pip install numpy")
+
+    if (isinstance(candidates, range) and candidates.step == 1
+            and 0 <= candidates.start <= candidates.stop < (1 << 63)):
+        lo, hi = candidates.start, candidates.stop
+        values = np.arange(lo, hi, dtype=np.uint64)
+        sieve_primes = small_primes_below(min(math.isqrt(hi) + 1, BATCH_RANGE_SIEVE_LIMIT))
+        mask = _segmented_sieve_mask(lo, hi, sieve_primes)
+    else:
+        raw_values = np.asarray(list(candidates) if isinstance(candidates, range) else candidates)
+        if raw_values.dtype == object or (raw_values.size and (raw_values.min() < 0 or raw_values.max() >= (1 << 63))):
+            # Big or negative numbers: NumPy cannot hold them in machine words
+            return np.array([int(value) > 1 and is_probable_prime(int(value), mode="bpsw")
+                             for value in raw_values.ravel()], dtype=bool).reshape(raw_values.shape)
+        values = raw_values.astype(np.uint64)
+        sieve_primes = small_primes_below(sieve_limit)
+        mask = values >= 2
+        for p in sieve_primes:
+            mask &= (values % np.uint64(p) != 0) | (values == p)
+
+    largest_sieve_prime = sieve_primes[-1] if sieve_primes else 1
+    needs_test = mask & (values >= largest_sieve_prime * largest_sieve_prime)
+    if largest_sieve_prime < 2:
+        needs_test &= values > 3
+
+    # Vectorised Miller-Rabin for word-sized survivors
+    word_sized = needs_test & (values < VECTORISED_MR_LIMIT)
+    small_survivors = np.flatnonzero(word_sized)
+    if small_survivors.size:
+        odd = values[small_survivors] % np.uint64(2) == 1
+        verdicts = np.zeros(small_survivors.size, dtype=bool)
+        test_values = values[small_survivors][odd]
+        small_bases = test_values <= max(VECTORISED_MR_BASES)
+        verdicts_odd = np.zeros(test_values.size, dtype=bool)
+        verdicts_odd[small_bases] = np.isin(test_values[small_bases], small_primes_below(62))
+        if (~small_bases).any():  # all survivors can be <= 61 when the sieve was tiny
+            verdicts_odd[~small_bases] = _vectorised_miller_rabin(test_values[~small_bases])
+        verdicts[odd] = verdicts_odd
+        mask[small_survivors] = verdicts
+
+    # Larger survivors, one at a time
+    for index in np.flatnonzero(needs_test & ~word_sized):
+        mask[index] = is_probable_prime(int(values[index]), mode="bpsw")
+    return mask
+
+
+# Search the sieved window after one random start for a prime
+def search_prime_window(bit_length, small_primes, window_size, primality_mode):
+    """
+    Pick one random odd start of 'bit_length' bits, sieve its window and
+    Miller-Rabin test the survivors. Returns the first prime found, or None
+    if the window runs out (or overflows bit_length) without one.
+    """
+    start = random.getrandbits(bit_length) | (1 << (bit_length - 1)) | 1
+    for prime_candidate in sieve_candidate_window(start, window_size, small_primes):
+        if prime_candidate.bit_length() > bit_length:
+            return None
+        if is_probable_prime(prime_candidate, number_of_rounds=40, mode=primality_mode):
+            return prime_candidate
+    return None
+
+
 # Generate a single large prime
-def generate_large_prime(bit_length=512):
+def generate_large_prime(bit_length=512, sieve_limit=SIEVE_PRIME_LIMIT, window_size=SIEVE_WINDOW_SIZE,
+                         primality_mode="fips"):
     """
     Produce a random prime number of approximately 'bit_length' bits.
 
     Method:
-    1. Generate random candidate of correct bit length:
+    1. Generate random starting point of correct bit length:
        - Set MSB = 1 → ensures desired size
        - Set LSB = 1 → ensures odd number
-    2. Test candidate using Miller-Rabin until prime found
+    2. Sieve the next 'window_size' odd numbers against the primes below 'sieve_limit'
+    3. Test only the survivors using Miller-Rabin until prime found
+       (see is_probable_prime for the "random", "fips" and "bpsw" modes)
+    4. If the window runs out (or overflows bit_length), pick a new random start
+
+    Parameters:
+    - sieve_limit: bound for the small-prime table (0 or 1 disables the sieve)
+    - window_size: how many odd offsets are sieved from each random start
     """
+    # Only use small primes below the smallest candidate, so a candidate can never be one of them
+    small_primes = [p for p in small_primes_below(sieve_limit) if p < (1 << (bit_length - 1))]
     while True:
-        prime_candidate = random.getrandbits(bit_length) | (1 << (bit_length - 1)) | 1
-        if is_probable_prime(prime_candidate, number_of_rounds=40):
-            return prime_candidate
+        prime = search_prime_window(bit_length, small_primes, window_size, primality_mode)
+        if prime is not None:
+            return prime
 
 
 # Generate two distinct primes for RSA
@@ -161,16 +756,115 @@ def generate_two_distinct_primes(bit_length=512):
         prime_two = generate_large_prime(bit_length)
     return prime_one, prime_two
 
+
+# Worker process for the parallel generators below
+def _prime_search_worker(bit_length, sieve_limit, window_size, primality_mode, stop_event, prime_queue):
+    """
+    Keep searching random windows and push every prime found onto prime_queue
+    until stop_event is set. The event is checked between windows, so a worker
+    never runs on for more than one window after the parent has enough primes.
+    """
+    random.seed(os.urandom(32))  # never share a random state with the other workers
+    small_primes = [p for p in small_primes_below(sieve_limit) if p < (1 << (bit_length - 1))]
+    while not stop_event.is_set():
+        prime = search_prime_window(bit_length, small_primes, window_size, primality_mode)
+        if prime is not None:
+            prime_queue.put(prime)
+
+
+def parallel_prime_stream(bit_length=512, processes=None, sieve_limit=SIEVE_PRIME_LIMIT,
+                          window_size=SIEVE_WINDOW_SIZE, primality_mode="fips"):
+    """
+    Yield distinct random primes of 'bit_length' bits found by a pool of worker processes.
+
+    - processes: number of workers (default: one per CPU core)
+    - The workers search independent random windows, so throughput grows
+      close to linearly with cores
+    - All workers are stopped as soon as the caller stops iterating (break,
+      close() or garbage collection of the generator)
+    """
+    processes = processes or os.cpu_count() or 1
+    stop_event = multiprocessing.Event()
+    prime_queue = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(
+            target=_prime_search_worker,
+            args=(bit_length, sieve_limit, window_size, primality_mode, stop_event, prime_queue),
+            daemon=True,
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    seen_primes = set()
+    try:
+        while True:
+            try:
+                prime = prime_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers):
+                    raise RuntimeError("All prime search workers exited unexpectedly.")
+                continue
+            if prime not in seen_primes:
+                seen_primes.add(prime)
+                yield prime
+    finally:
+        stop_event.set()
+        for worker in workers:
+            worker.join(timeout=1)
+            if worker.is_alive():
+                worker.terminate()  # still busy with a big window, nothing to save
+                worker.join()
+        prime_queue.cancel_join_thread()
+        prime_queue.close()
+
+
+# Generate two distinct primes for RSA on all cores
+def generate_two_distinct_primes_parallel(bit_length=512, processes=None):
+    """
+    Parallel version of generate_two_distinct_primes: the candidate search is
+    spread over a process pool and stops as soon as two distinct primes exist.
+    """
+    stream = parallel_prime_stream(bit_length, processes)
+    try:
+        return next(stream), next(stream)
+    finally:
+        stream.close()
+
+
+# Bulk mode, e.g. for load-testing a key service
+def generate_prime_pairs(count, bit_length=512, processes=None):
+    """
+    Yield 'count' (p, q) pairs of distinct bit_length-bit primes from one
+    shared worker pool. No prime is repeated across any of the pairs.
+    """
+    stream = parallel_prime_stream(bit_length, processes)
+    try:
+        for _ in range(count):
+            yield next(stream), next(stream)
+    finally:
+        stream.close()
+
+
 # Compute private exponent d using Extended Euclidean Algorithm
 def extended_gcd(a, b):
-    """Return (g, x, y) such that a*x + b*y = g = gcd(a,b)"""
-    if a == 0:
-        return (b, 0, 1)
-    else:
-        g, x1, y1 = extended_gcd(b % a, a)
-        x = y1 - (b // a) * x1
-        y = x1
-        return (g, x, y)
+    """
+    Return (g, x, y) such that a*x + b*y = g = gcd(a,b)
+
+    Iterative version: keeps the running Bezout coefficients for the last two
+    remainders instead of recursing, so there is no Python frame per step and
+    no recursion limit on long inputs (e.g. consecutive Fibonacci numbers).
+    """
+    old_r, r = a, b
+    old_x, x = 1, 0
+    old_y, y = 0, 1
+    while r != 0:
+        quotient = old_r // r
+        old_r, r = r, old_r - quotient * r
+        old_x, x = x, old_x - quotient * x
+        old_y, y = y, old_y - quotient * y
+    return (old_r, old_x, old_y)
 
 # Modular inverse of e mod φ(n)
 def mod_inverse(e, phi):
@@ -180,6 +874,121 @@ def mod_inverse(e, phi):
     else:
         return x % phi
 
+# Invert many values modulo the same modulus (Montgomery's trick)
+def batch_mod_inverse(values, modulus):
+    """
+    Return [v^-1 mod modulus for v in values] using a single modular inversion.
+
+    Method:
+    1. Prefix products: prefix[i] = v0 * v1 * ... * vi (mod modulus)
+    2. Invert only the final product
+    3. Walk backwards: inverse(vi) = prefix[i-1] * running_inverse, then
+       running_inverse *= vi strips vi off again
+    Total cost: one inversion plus about 3n multiplications.
+    """
+    values = list(values)
+    if not values:
+        return []
+
+    prefix_products = []
+    running_product = 1
+    for value in values:
+        running_product = (running_product * value) % modulus
+        prefix_products.append(running_product)
+
+    running_inverse = mod_inverse(running_product, modulus)  # raises if any value is not invertible
+
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = (prefix_products[i - 1] * running_inverse) % modulus
+        running_inverse = (running_inverse * values[i]) % modulus
+    inverses[0] = running_inverse
+    return inverses
+
+# Remainders of very large numbers (remainder_tree works with megabit operands)
+# Python's own % is schoolbook division, quadratic in the operand size. Burnikel-Ziegler
+# division splits the work into multiplications, which Python does in sub-quadratic time.
+# Adapted from CPython's Lib/_pylong.py (Python 3.12), reference:
+# Burnikel & Ziegler (1998). "Fast Recursive Division". MPI-I-98-1-022.
+LARGE_DIVISION_BITS = 1 << 15   # below this modulus size plain % is faster
+_DIVISION_BASE_BITS = 4000      # recursion stops at quotients this small
+
+def _divide_2n_by_n(a, b, n):
+    """(a // b, a % b) for an n-bit b and a < 2^n * b."""
+    if a.bit_length() - n <= _DIVISION_BASE_BITS:
+        return divmod(a, b)
+    pad = n & 1
+    if pad:
+        a <<= 1
+        b <<= 1
+        n += 1
+    half_n = n >> 1
+    mask = (1 << half_n) - 1
+    b1, b2 = b >> half_n, b & mask
+    q1, r = _divide_3n_by_2n(a >> n, (a >> half_n) & mask, b, b1, b2, half_n)
+    q2, r = _divide_3n_by_2n(r, a & mask, b, b1, b2, half_n)
+    if pad:
+        r >>= 1
+    return q1 << half_n | q2, r
+
+def _divide_3n_by_2n(a12, a3, b, b1, b2, n):
+    if a12 >> n == b1:
+        q, r = (1 << n) - 1, a12 - (b1 << n) + b1
+    else:
+        q, r = _divide_2n_by_n(a12, b1, n)
+    r = (r << n | a3) - q * b2
+    while r < 0:
+        q -= 1
+        r += b
+    return q, r
+
+def large_mod(value, modulus):
+    """value % modulus for non-negative value and positive modulus, fast for megabit operands."""
+    n = modulus.bit_length()
+    if n < LARGE_DIVISION_BITS or type(value) is not int or type(modulus) is not int:
+        return value % modulus  # small, or a type (e.g. gmpy2.mpz) with fast division already
+    remainder = 0
+    mask = (1 << n) - 1
+    for i in range((value.bit_length() + n - 1) // n - 1, -1, -1):  # value in base 2^n, top digit first
+        _, remainder = _divide_2n_by_n((remainder << n) | ((value >> (i * n)) & mask), modulus, n)
+    return remainder
+
+
+# Product tree: leaves are the values, every node the product of its two children
+def product_tree(values):
+    """
+    Return the levels of the product tree over values, leaves first and root last,
+    so product_tree(values)[-1][0] is the product of all values.
+    Multiplying neighbours pairwise keeps the operands balanced, which is much
+    faster than a running product for thousands of values.
+    """
+    levels = [list(values)]
+    if not levels[0]:
+        return levels
+    while len(levels[-1]) > 1:
+        below = levels[-1]
+        levels.append([below[i] * below[i + 1] if i + 1 < len(below) else below[i]
+                       for i in range(0, len(below), 2)])
+    return levels
+
+
+# Remainder tree: one big value reduced modulo every leaf of a product tree
+def remainder_tree(value, levels, square_leaves=False):
+    """
+    Return [value mod leaf for leaf in levels[0]], reducing down the tree
+    (value mod root, then each remainder mod the two children) so the full-size
+    value is only reduced once. Big nodes are divided with large_mod.
+    With square_leaves=True every node is squared first and the results are
+    value mod leaf^2 (the form Bernstein's batch GCD needs).
+    """
+    if not levels[0]:
+        return []
+    remainders = [value]
+    for level in reversed(levels):
+        remainders = [large_mod(remainders[i // 2], node * node if square_leaves else node)
+                      for i, node in enumerate(level)]
+    return remainders
+
 def gcd(a, b):
     while b != 0:
         a, b = b, a % b
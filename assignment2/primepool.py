@@ -0,0 +1,237 @@
+"""
+primepool.py
+Pre-generated pools of primes and RSA key pairs, refilled in the background,
+so key generation no longer sits on the request path.
+
+How it works:
+- One reservoir (a deque) per size, e.g. {1024: [...], 2048: [...]}
+- take(size) pops a ready item in O(1); only an empty reservoir falls back
+  to generating on the spot (counted as a "miss" in the metrics)
+- A background thread refills any reservoir that drops below the low
+  watermark back up to the high watermark, one item at a time for whichever
+  refilling reservoir is emptiest, so a slow size cannot starve the others
+- Reservoirs are saved to a JSON file (written atomically) after each change,
+  so the next run of a script starts with ready items
+
+Note:
+- Items are removed from the file as soon as they are taken, but a crash
+  between take() and the next save could hand the same item out again.
+  Do not point two processes at the same store file.
+
+References:
+- Python threading documentation (Condition objects): https://docs.python.org/3/library/threading.html
+- Cryptography.io documentation (key serialization): https://cryptography.io/en/latest/
+"""
+
+import collections
+import json
+import os
+import threading
+import time
+
+import primegen as pg
+
+
+class ReservoirPool:
+    """
+    Bounded, persisted reservoirs of pre-generated items, one per size.
+
+    Parameters:
+    - producer: function(size) -> new item (e.g. a prime of 'size' bits)
+    - sizes: sizes to keep stocked
+    - store_path: JSON file to persist the reservoirs to (None = memory only)
+    - low_watermark: refill starts when a reservoir holds fewer items than this
+    - high_watermark: refill stops once a reservoir holds this many items
+    - encode / decode: convert items to and from JSON-friendly values
+    """
+
+    def __init__(self, producer, sizes, store_path=None, low_watermark=4, high_watermark=16,
+                 encode=lambda item: item, decode=lambda value: value):
+        if not 0 <= low_watermark <= high_watermark:
+            raise ValueError("Watermarks must satisfy 0 <= low_watermark <= high_watermark.")
+        self.producer = producer
+        self.sizes = list(sizes)
+        self.store_path = store_path
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.encode = encode
+        self.decode = decode
+
+        self._reservoirs = {size: collections.deque() for size in self.sizes}
+        self._stats = {size: {"taken": 0, "misses": 0, "produced": 0, "refill_seconds": 0.0}
+                       for size in self.sizes}
+        self._refilling = set()  # sizes that dropped below the low watermark and are not yet back at the high one
+        self._condition = threading.Condition()
+        self._save_lock = threading.Lock()  # take() and the refill thread both save
+        self._worker = None
+        self._stopping = False
+        self._load()
+
+    # ----- Persistence -----
+    def _load(self):
+        if not self.store_path or not os.path.exists(self.store_path):
+            return
+        with open(self.store_path, "r") as f:
+            stored = json.load(f)
+        for size in self.sizes:
+            for value in stored.get(str(size), [])[:self.high_watermark]:
+                self._reservoirs[size].append(self.decode(value))
+
+    def _save(self):
+        """
+        Write all reservoirs to store_path (temp file + rename, so it is never half-written).
+        Saves are serialised: take() and the refill thread share one temp file, and the
+        snapshot is taken inside the lock so the last rename always holds the newest state.
+        """
+        if not self.store_path:
+            return
+        with self._save_lock:
+            with self._condition:
+                snapshot = {str(size): [self.encode(item) for item in reservoir]
+                            for size, reservoir in self._reservoirs.items()}
+            os.makedirs(os.path.dirname(os.path.abspath(self.store_path)), exist_ok=True)
+            temp_path = self.store_path + ".tmp"
+            with open(temp_path, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.store_path)
+
+    # ----- Background refill -----
+    def start(self):
+        """Start the background refill thread (safe to call more than once)."""
+        with self._condition:
+            if self._worker is not None and self._worker.is_alive():
+                return self
+            self._stopping = False
+            self._worker = threading.Thread(target=self._refill_loop, name="reservoir-refill", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self):
+        """Stop the refill thread after its current item and save the reservoirs."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+        self._save()
+
+    def _size_needing_refill(self):
+        """
+        The size to produce the next item for, or None if every reservoir is stocked:
+        the emptiest of the sizes that dropped below the low watermark and have not
+        yet been refilled to the high watermark. Call with the condition held.
+        """
+        for size in self.sizes:
+            depth = len(self._reservoirs[size])
+            if depth < self.low_watermark:
+                self._refilling.add(size)
+            elif depth >= self.high_watermark:
+                self._refilling.discard(size)
+        if not self._refilling:
+            return None
+        return min(self._refilling, key=lambda size: (len(self._reservoirs[size]), self.sizes.index(size)))
+
+    def _refill_loop(self):
+        while True:
+            with self._condition:
+                size = self._size_needing_refill()
+                while size is None and not self._stopping:
+                    self._condition.wait()
+                    size = self._size_needing_refill()
+                if self._stopping:
+                    return
+
+            # One item per pass, then choose again, so every low size gets its turn
+            started = time.perf_counter()
+            item = self.producer(size)
+            elapsed = time.perf_counter() - started
+            with self._condition:
+                self._reservoirs[size].append(item)
+                self._stats[size]["produced"] += 1
+                self._stats[size]["refill_seconds"] += elapsed
+            self._save()
+
+    # ----- Public API -----
+    def take(self, size):
+        """
+        Return a ready item of the given size in O(1).
+        If the reservoir is empty the item is generated on the spot instead.
+        """
+        with self._condition:
+            reservoir = self._reservoirs[size]
+            item = reservoir.popleft() if reservoir else None
+            self._stats[size]["taken"] += 1
+            if item is None:
+                self._stats[size]["misses"] += 1
+            if len(reservoir) < self.low_watermark:
+                self._condition.notify_all()
+        if item is None:
+            return self.producer(size)
+        self._save()  # so a taken item is not handed out again on the next run
+        return item
+
+    def depth(self, size):
+        return len(self._reservoirs[size])
+
+    def metrics(self):
+        """
+        Per-size metrics:
+        - depth: items ready right now
+        - taken / misses: items handed out, and how many had to be generated on the spot
+        - produced: items made by the refill thread
+        - refill_rate: items produced per second of refill work
+        """
+        with self._condition:
+            report = {}
+            for size in self.sizes:
+                stats = self._stats[size]
+                report[size] = {
+                    "depth": len(self._reservoirs[size]),
+                    "taken": stats["taken"],
+                    "misses": stats["misses"],
+                    "produced": stats["produced"],
+                    "refill_rate": stats["produced"] / stats["refill_seconds"] if stats["refill_seconds"] else 0.0,
+                }
+            return report
+
+
+# Pool of random primes for the manual RSA in task2-rsa-manual.py
+def prime_pool(sizes=(256, 512, 1024), store_path=None, low_watermark=4, high_watermark=16):
+    """Pool of primes, keyed by bit length and produced by primegen.generate_large_prime."""
+    return ReservoirPool(pg.generate_large_prime, sizes, store_path, low_watermark, high_watermark)
+
+
+def take_two_distinct_primes(pool, bit_length):
+    """Pool equivalent of primegen.generate_two_distinct_primes."""
+    prime_one = pool.take(bit_length)
+    prime_two = pool.take(bit_length)
+    while prime_two == prime_one:
+        prime_two = pool.take(bit_length)
+    return prime_one, prime_two
+
+
+# Pool of RSA key pairs (cryptography objects) for task4-hybrid.py and q7_secure_cipher.py
+def rsa_key_pool(sizes=(2048,), store_path=None, low_watermark=2, high_watermark=8, public_exponent=65537):
+    """
+    Pool of cryptography RSA private keys, keyed by key size.
+    Keys are stored as unencrypted PKCS8 PEM, so keep store_path next to the
+    other private keys (e.g. the keys/ folder) and out of version control.
+    """
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.hazmat.primitives import serialization
+
+    def produce(key_size):
+        return rsa.generate_private_key(public_exponent=public_exponent, key_size=key_size)
+
+    def encode(private_key):
+        return private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption()
+        ).decode()
+
+    def decode(pem_text):
+        return serialization.load_pem_private_key(pem_text.encode(), password=None)
+
+    return ReservoirPool(produce, sizes, store_path, low_watermark, high_watermark, encode, decode)
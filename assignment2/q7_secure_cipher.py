@@ -16,26 +16,32 @@ import os
 from base64 import b64encode
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import hashes, serialization
+from primepool import rsa_key_pool
 
 # BASE variable for cross-platform paths
 BASE = os.path.dirname(os.path.abspath(__file__))
 KEYS_FOLDER = os.path.join(BASE, "keys")
 OUTPUT_FOLDER = os.path.join(BASE, "output")
+KEY_POOL_PATH = os.path.join(KEYS_FOLDER, "rsa_key_pool.json")  # pre-generated keys, see primepool.py
 
 #  RSA Key Generation
-def generate_keys():
+def generate_keys(key_pool=None):
     """
     Generate RSA private and public keys.
     - Key size: 2048 bits (secure standard)
     - Public exponent: 65537 (common choice for RSA)
+    - If a key_pool (primepool.rsa_key_pool) is given, a pre-generated key is taken from it instead
     
     Returns:
         private_key, public_key (cryptography objects)
     """
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-    )
+    if key_pool is not None:
+        private_key = key_pool.take(2048)
+    else:
+        private_key = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+        )
     public_key = private_key.public_key()
     return private_key, public_key
 
@@ -84,8 +90,9 @@ def encrypt_message(message, public_key):
 
 # Main Execution
 if __name__ == "__main__":
-    # Generate RSA keys
-    private_key, public_key = generate_keys()
+    # Take RSA keys from the pre-generated pool (refilled in the background)
+    key_pool = rsa_key_pool(store_path=KEY_POOL_PATH).start()
+    private_key, public_key = generate_keys(key_pool)
     
     # Save public key to key.txt for compatibility with Cipher.exe
     key_path = os.path.join(KEYS_FOLDER, "key.txt")
@@ -106,3 +113,6 @@ if __name__ == "__main__":
     # Display encryption results
     print("\nEncryption complete. Ciphertext (base64):")
     print(cipher_b64.decode())
+
+    # Stop the background refill and save the remaining pre-generated keys for next time
+    key_pool.stop()
@@ -0,0 +1,129 @@
+"""
+rsakey.py
+Textbook RSA key objects built on primegen.py, with private-key operations
+done through the Chinese Remainder Theorem (CRT).
+
+References:
+1. RFC 8017 (PKCS #1 v2.2), Section 3.2 and 5.1.2 - CRT private key representation and RSADP
+   https://www.rfc-editor.org/rfc/rfc8017
+2. Garner's algorithm / CRT recombination (Handbook of Applied Cryptography, Note 14.75)
+   https://cacr.uwaterloo.ca/hac/about/chap14.pdf
+3. Boneh, DeMillo & Lipton (1997). "On the Importance of Checking Cryptographic Protocols for Faults"
+   (why the optional recombination check matters)
+
+Why CRT is faster:
+- Instead of one exponentiation mod n with a full-size d, we do two
+  exponentiations mod p and mod q with half-size exponents dP and dQ
+- Each half-size exponentiation costs about 1/8 of the full one (half the
+  exponent bits, numbers a quarter of the cost to multiply), so the pair
+  is roughly 3-4x faster overall
+"""
+
+import primegen as pg
+
+
+class RSAPublicKey:
+    """Textbook RSA public key (n, e)."""
+
+    def __init__(self, modulus_n, public_exponent_e):
+        self.modulus_n = modulus_n
+        self.public_exponent_e = public_exponent_e
+
+    def encrypt(self, message):
+        """c = m^e mod n"""
+        return pg.modular_exponentiation(message, self.public_exponent_e, self.modulus_n)
+
+    def verify(self, message, signature):
+        """A signature s is valid for m when s^e mod n == m."""
+        return pg.modular_exponentiation(signature, self.public_exponent_e, self.modulus_n) == message % self.modulus_n
+
+
+class RSAPrivateKey:
+    """
+    Textbook RSA private key that keeps p and q and decrypts/signs via the CRT.
+
+    Precomputed values (as in RFC 8017):
+    - dP   = d mod (p-1)
+    - dQ   = d mod (q-1)
+    - qInv = q^-1 mod p
+
+    Set verify_crt=True to re-encrypt every CRT result and compare with the
+    input before returning it. A fault in either half-exponentiation would
+    otherwise leak a factor of n through gcd(s^e - m, n).
+    """
+
+    def __init__(self, prime_p, prime_q, public_exponent_e=65537, verify_crt=False):
+        if prime_p == prime_q:
+            raise ValueError("p and q must be distinct primes.")
+        totient_phi = (prime_p - 1) * (prime_q - 1)
+        if pg.gcd(public_exponent_e, totient_phi) != 1:
+            raise ValueError("Chosen e is not coprime to φ(n). Choose a different e.")
+
+        self.prime_p = prime_p
+        self.prime_q = prime_q
+        self.modulus_n = prime_p * prime_q
+        self.totient_phi = totient_phi
+        self.public_exponent_e = public_exponent_e
+        self.private_exponent_d = pg.mod_inverse(public_exponent_e, totient_phi)
+        self.verify_crt = verify_crt
+
+        # CRT parameters
+        self.exponent_dp = self.private_exponent_d % (prime_p - 1)
+        self.exponent_dq = self.private_exponent_d % (prime_q - 1)
+        self.coefficient_qinv = pg.mod_inverse(prime_q, prime_p)
+
+    @classmethod
+    def generate(cls, bit_length=512, public_exponent_e=65537, verify_crt=False):
+        """Generate a fresh key from two distinct bit_length-bit primes."""
+        while True:
+            prime_p, prime_q = pg.generate_two_distinct_primes(bit_length)
+            if pg.gcd(public_exponent_e, (prime_p - 1) * (prime_q - 1)) == 1:
+                return cls(prime_p, prime_q, public_exponent_e, verify_crt)
+
+    @classmethod
+    def generate_many(cls, count, bit_length=512, public_exponent_e=65537, processes=None, verify_crt=False):
+        """
+        Yield 'count' fresh keys, with the prime search spread over a process pool
+        (see primegen.generate_prime_pairs). Pairs where e is not coprime to φ(n)
+        are skipped.
+        """
+        produced = 0
+        while produced < count:
+            for prime_p, prime_q in pg.generate_prime_pairs(count - produced, bit_length, processes):
+                if pg.gcd(public_exponent_e, (prime_p - 1) * (prime_q - 1)) == 1:
+                    produced += 1
+                    yield cls(prime_p, prime_q, public_exponent_e, verify_crt)
+
+    def public_key(self):
+        return RSAPublicKey(self.modulus_n, self.public_exponent_e)
+
+    def _crt_power(self, value):
+        """
+        Compute value^d mod n using the CRT (Garner recombination).
+
+        1. m1 = value^dP mod p
+        2. m2 = value^dQ mod q
+        3. h  = qInv * (m1 - m2) mod p
+        4. m  = m2 + h * q
+        """
+        m1 = pg.modular_exponentiation(value, self.exponent_dp, self.prime_p)
+        m2 = pg.modular_exponentiation(value, self.exponent_dq, self.prime_q)
+        h = (self.coefficient_qinv * (m1 - m2)) % self.prime_p
+        result = m2 + h * self.prime_q
+
+        if self.verify_crt and pg.modular_exponentiation(result, self.public_exponent_e, self.modulus_n) != value % self.modulus_n:
+            raise ArithmeticError("CRT recombination check failed, result discarded.")
+        return result
+
+    def decrypt(self, ciphertext):
+        """m = c^d mod n, computed via the CRT."""
+        return self._crt_power(ciphertext)
+
+    def sign(self, message):
+        """s = m^d mod n, computed via the CRT."""
+        return self._crt_power(message)
+
+    def decrypt_without_crt(self, ciphertext):
+        """Plain m = c^d mod n over the full modulus (for comparison)."""
+        return pg.modular_exponentiation(ciphertext, self.private_exponent_d, self.modulus_n)
+
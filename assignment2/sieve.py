@@ -0,0 +1,139 @@
+"""
+sieve.py
+Segmented, odd-only Sieve of Eratosthenes for scanning the primes near a
+base value (e.g. a student ID) without sympy.
+
+How it works:
+- Only odd numbers are stored (2 is handled separately), halving the memory
+- The range is processed one fixed-size segment at a time, so memory stays
+  constant however wide the window is
+- Each segment is crossed off with the primes up to sqrt(hi) (capped at
+  BASE_PRIME_LIMIT). For bases beyond BASE_PRIME_LIMIT^2 (up to 64 bits and
+  more) the survivors are confirmed with primegen's deterministic Miller-Rabin
+- next_prime / prev_prime only need the first prime either side, so they sieve
+  a small window (NEIGHBOUR_WINDOW odd numbers) with a fixed small-prime table
+  and step on until a survivor passes Miller-Rabin: a lookup near 2^63 costs
+  well under a millisecond instead of a full segment
+
+References:
+1. Sieve of Eratosthenes (CP-Algorithms, "Segmented Sieve"):
+   https://cp-algorithms.com/algebra/sieve-of-eratosthenes.html
+2. primegen.py (this folder) for the small-prime table and Miller-Rabin
+"""
+
+import bisect
+import math
+
+import primegen as pg
+
+SEGMENT_SIZE = 1 << 16         # odd numbers per segment (one byte each)
+BASE_PRIME_LIMIT = 1 << 20     # largest sieving prime kept in memory
+NEIGHBOUR_WINDOW = 128         # odd numbers sieved per step by next_prime / prev_prime
+NEIGHBOUR_SIEVE_LIMIT = 1 << 10  # their sieving primes (a fixed table, whatever the size of n)
+
+
+def _base_primes(hi):
+    """
+    Odd sieving primes needed for numbers below hi, and the bound they were taken below.
+    Every composite below bound^2 has a factor in the list.
+    """
+    bound = min(math.isqrt(hi) + 1, BASE_PRIME_LIMIT)
+    return pg.small_primes_below(bound)[1:], bound
+
+
+def _is_confirmed(candidate, sieve_bound):
+    """A segment survivor is prime for sure below sieve_bound^2, beyond that Miller-Rabin decides."""
+    if candidate < sieve_bound * sieve_bound:
+        return True
+    if candidate < pg.DETERMINISTIC_LIMIT:
+        return pg.is_prime_deterministic(candidate)
+    return pg.is_probable_prime(candidate, mode="bpsw")
+
+
+def _sieve_segment(segment_lo, segment_hi, base_primes):
+    """
+    Sieve the odd numbers segment_lo, segment_lo+2, ... < segment_hi (segment_lo odd).
+    Returns a bytearray with 1 at index i when segment_lo + 2*i has no factor in base_primes.
+    """
+    count = (segment_hi - segment_lo + 1) // 2
+    flags = bytearray([1]) * count
+    for p in base_primes:
+        if p * p >= segment_hi:
+            break
+        first_multiple = max(p * p, (segment_lo + p - 1) // p * p)
+        if first_multiple % 2 == 0:
+            first_multiple += p  # only odd multiples are stored
+        first_index = (first_multiple - segment_lo) // 2
+        flags[first_index::p] = bytes(len(range(first_index, count, p)))
+    return flags
+
+
+def iter_primes(lo, hi, segment_size=SEGMENT_SIZE):
+    """Yield every prime p with lo <= p < hi, in increasing order, in constant memory."""
+    if hi <= 2 or lo >= hi:
+        return
+    if lo <= 2:
+        yield 2
+    base_primes, sieve_bound = _base_primes(hi)
+    segment_lo = max(lo, 3) | 1
+    while segment_lo < hi:
+        segment_hi = min(segment_lo + 2 * segment_size, hi)
+        flags = _sieve_segment(segment_lo, segment_hi, base_primes)
+        for index in range(len(flags)):
+            if flags[index]:
+                candidate = segment_lo + 2 * index
+                if _is_confirmed(candidate, sieve_bound):
+                    yield candidate
+        segment_lo = segment_hi | 1
+
+
+def _neighbour_candidates(start, window_size):
+    """Odd numbers start, start+2, ... (window_size of them) without a factor below NEIGHBOUR_SIEVE_LIMIT."""
+    return pg.sieve_candidate_window(start, window_size, pg.small_primes_below(NEIGHBOUR_SIEVE_LIMIT))
+
+
+def next_prime(n, window_size=NEIGHBOUR_WINDOW):
+    """Smallest prime strictly greater than n (same as sympy.nextprime)."""
+    table = pg.small_primes_below(NEIGHBOUR_SIEVE_LIMIT)
+    if n < table[-1]:
+        return table[bisect.bisect_right(table, n)]
+    start = (n + 1) | 1
+    while True:
+        for candidate in _neighbour_candidates(start, window_size):
+            if _is_confirmed(candidate, NEIGHBOUR_SIEVE_LIMIT):
+                return candidate
+        start += 2 * window_size
+
+
+def prev_prime(n, window_size=NEIGHBOUR_WINDOW):
+    """Largest prime strictly less than n (same as sympy.prevprime)."""
+    if n <= 2:
+        raise ValueError("There is no prime below 2.")
+    table = pg.small_primes_below(NEIGHBOUR_SIEVE_LIMIT)
+    if n <= NEIGHBOUR_SIEVE_LIMIT + 2 * window_size:
+        # close to the table: its own primes must not be crossed off as multiples
+        return table[bisect.bisect_left(table, n) - 1] if n <= table[-1] + 1 else max(iter_primes(table[-1], n))
+    top = n - 1 if n % 2 == 0 else n - 2  # largest odd number below n
+    while True:
+        start = top - 2 * (window_size - 1)
+        for candidate in reversed(list(_neighbour_candidates(start, window_size))):
+            if _is_confirmed(candidate, NEIGHBOUR_SIEVE_LIMIT):
+                return candidate
+        top = start - 2
+
+
+def prime_gaps(lo, hi, segment_size=SEGMENT_SIZE):
+    """
+    Yield (p, q, q - p) for each pair of consecutive primes p < q in [lo, hi).
+    Useful for spotting how close the primes around a base value are.
+    """
+    previous = None
+    for prime in iter_primes(lo, hi, segment_size):
+        if previous is not None:
+            yield previous, prime, prime - previous
+        previous = prime
+
+
+def neighbouring_primes(n):
+    """Return (prev_prime(n), next_prime(n)), the primes either side of n."""
+    return prev_prime(n), next_prime(n)
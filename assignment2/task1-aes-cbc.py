@@ -8,16 +8,22 @@ This decryption code is adapted from:
 Additional explanations:
 - binascii is used to convert between hexadecimal strings and bytes, which is necessary because the encrypted file stores the ciphertext as a hex string rather than raw bytes.
 - AES decryption is performed in CBC mode with PKCS7 padding.
+- decrypt_file_parallel splits the ciphertext into chunks and decrypts them on several
+  threads: in CBC each plaintext block only depends on two ciphertext blocks, so every chunk
+  can start from the previous chunk's last ciphertext block as its IV.
 
 References:
 1. COSC2536 Practical 7 "aes_cbc_file.py" AES encryption/decryption sample code 
 2. Python binascii module documentation: https://docs.python.org/3/library/binascii.html
 3. Cryptography.io documentation: https://cryptography.io/en/latest/
+4. NIST SP 800-38A, Section 6.2 (CBC decryption can be parallelised):
+   https://csrc.nist.gov/publications/detail/sp/800-38a/final
 """
 
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import padding
 import binascii   # used to convert hex strings to bytes and vice versa
+from concurrent.futures import ThreadPoolExecutor
 import os
 import os.path
 
@@ -25,6 +31,9 @@ import os.path
 # Ensures file paths work on any OS - as per Lecture 4 onwards
 BASE = os.path.dirname(os.path.abspath(__file__))
 
+# Ciphertext bytes decrypted per thread task (a multiple of the 16-byte AES block)
+PARALLEL_CHUNK_SIZE = 16 * 1024 * 1024
+
 
 # Function to decrypt an AES-CBC encrypted file stored as hex
 def decrypt_file(input_file_path, output_file_path, key_file_path):
@@ -77,6 +86,64 @@ def decrypt_file(input_file_path, output_file_path, key_file_path):
     print("Decrypted text:\n" + plaintext_bytes.decode())
 
 
+# Multi-threaded CBC decryption of ciphertext already in memory
+def decrypt_cbc_parallel(key_bytes, iv, ciphertext, chunk_size=PARALLEL_CHUNK_SIZE, workers=None):
+    """
+    Decrypts AES-CBC ciphertext on several threads and removes the PKCS7 padding.
+
+    Parameters:
+    - key_bytes, iv: the AES key and the IV that was used for encryption
+    - ciphertext: the whole ciphertext (bytes), a multiple of 16 bytes long
+    - chunk_size: ciphertext bytes per thread task (rounded up to a multiple of 16)
+    - workers: number of threads (default: one per CPU)
+
+    Process:
+    1. Split the ciphertext into chunks at block boundaries
+    2. Decrypt every chunk on its own thread, using the last ciphertext block
+       before it as its IV (the real IV for the first chunk)
+    3. Remove PKCS7 padding from the final chunk only
+
+    cryptography releases the GIL while it decrypts, so the threads run on separate cores.
+    Gives the same result as decrypt_file's decryption, including the ValueError for bad padding.
+    """
+    if not ciphertext or len(ciphertext) % 16:
+        raise ValueError("The length of the provided data is not a multiple of the block length.")
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk size {chunk_size}")
+    chunk_size = -(-chunk_size // 16) * 16  # chunks must start on a block boundary
+    ciphertext = memoryview(ciphertext)
+    starts = range(0, len(ciphertext), chunk_size)
+
+    def decrypt_chunk(start):
+        chunk_iv = iv if start == 0 else ciphertext[start - 16:start]
+        decryptor = Cipher(algorithms.AES(key_bytes), modes.CBC(chunk_iv)).decryptor()
+        return decryptor.update(ciphertext[start:start + chunk_size]) + decryptor.finalize()
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        chunks = list(pool.map(decrypt_chunk, starts))
+
+    # Only the final chunk carries the padding
+    unpadder = padding.PKCS7(algorithms.AES.block_size).unpadder()
+    chunks[-1] = unpadder.update(chunks[-1]) + unpadder.finalize()
+    return b"".join(chunks)
+
+
+# Same as decrypt_file, decrypting on several threads
+def decrypt_file_parallel(input_file_path, output_file_path, key_file_path, chunk_size=PARALLEL_CHUNK_SIZE, workers=None):
+    """
+    Decrypts a hex-encoded AES-CBC file like decrypt_file, using decrypt_cbc_parallel.
+    Meant for large files, so the plaintext is not printed.
+    """
+    with open(input_file_path, 'r') as f:
+        cipher_bytes = binascii.unhexlify(f.read().strip())
+    with open(key_file_path, 'r') as f:
+        key_bytes = binascii.unhexlify(f.read().strip())
+
+    plaintext_bytes = decrypt_cbc_parallel(key_bytes, cipher_bytes[:16], cipher_bytes[16:], chunk_size, workers)
+    with open(output_file_path, 'wb') as f:
+        f.write(plaintext_bytes)
+
+
 # Driver code
 print('─' * 10)
 
@@ -35,7 +35,9 @@ NOTE:
 import os
 import os.path 
 import primegen as pg  
+from rsakey import RSAPrivateKey
 # I'm importing functions from primegen.py to keep it clean(ish) below. I'm also trying to comment a bit more than usual!
+# The RSA key maths (d, and the CRT values for fast decryption) lives in rsakey.py
 
 #for making paths working on all OS. Adapted from COSC2536 Lecture 4 onwards
 BASE=os.path.dirname(os.path.abspath(__file__))
@@ -48,30 +50,24 @@ print("RSA primes generated:")
 print("p =", prime_p)
 print("q =", prime_q)
 
-#  Compute RSA parameters
-modulus_n = prime_p * prime_q                # n = p * q
-totient_phi = (prime_p - 1) * (prime_q - 1) # φ(n) = (p-1)*(q-1)
-
 # Choose a public exponent e
 # Common choice: 65537 (must be coprime to φ(n))
 public_exponent_e = 65537
 
-# Verify gcd(e, φ(n)) = 1
-if pg.gcd(public_exponent_e, totient_phi) != 1:
-    raise ValueError("Chosen e is not coprime to φ(n). Choose a different e.")
-
-# Compute private exponent d, the modular inverse of e mod φ(n)
-private_exponent_d = pg.mod_inverse(public_exponent_e, totient_phi)
+# Build the private key: computes n = p * q, φ(n) = (p-1)*(q-1), checks gcd(e, φ(n)) = 1,
+# then d = e^-1 mod φ(n) plus dP, dQ and qInv for CRT decryption
+private_key = RSAPrivateKey(prime_p, prime_q, public_exponent_e, verify_crt=True)
+public_key = private_key.public_key()
 
 print("\nRSA key parameters:")
-print("n =", modulus_n)
-print("φ(n) =", totient_phi)
-print("Public exponent e =", public_exponent_e)
-print("Private exponent d =", private_exponent_d)
+print("n =", private_key.modulus_n)
+print("φ(n) =", private_key.totient_phi)
+print("Public exponent e =", private_key.public_exponent_e)
+print("Private exponent d =", private_key.private_exponent_d)
 
 #  Encrypt student number
 student_number = 4101575
-ciphertext = pg.modular_exponentiation(student_number, public_exponent_e, modulus_n)
+ciphertext = public_key.encrypt(student_number)
 
 # Save ciphertext to output file
 ciphertext_file_path = os.path.join(BASE, "output", "student_number_encrypted.txt")
@@ -81,8 +77,8 @@ with open(ciphertext_file_path, "w") as f:
 print("\nCiphertext saved to:", ciphertext_file_path)
 print("Ciphertext:", ciphertext)
 
-#  Decrypt ciphertext 
-decrypted_message = pg.modular_exponentiation(ciphertext, private_exponent_d, modulus_n)
+#  Decrypt ciphertext (CRT: two half-size exponentiations mod p and mod q)
+decrypted_message = private_key.decrypt(ciphertext)
 
 # Save decrypted message to output file
 decrypted_file_path = os.path.join(BASE, "output", "student_number_decrypted.txt")
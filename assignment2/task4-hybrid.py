@@ -18,6 +18,7 @@ from cryptography.hazmat.primitives.asymmetric import rsa, padding as asym_paddi
 from cryptography.hazmat.primitives import serialization, hashes, padding as sym_padding
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
+from primepool import rsa_key_pool
 
 
 # BASE variable for cross-platform paths
@@ -26,22 +27,27 @@ BASE = os.path.dirname(os.path.abspath(__file__))
 INPUT_FOLDER = os.path.join(BASE, "input")
 KEYS_FOLDER = os.path.join(BASE, "keys")
 OUTPUT_FOLDER = os.path.join(BASE, "output")
+KEY_POOL_PATH = os.path.join(KEYS_FOLDER, "rsa_key_pool.json")  # pre-generated keys, see primepool.py
 
 
-def generate_rsa_keys():
+def generate_rsa_keys(key_pool=None):
     """
     Generate RSA private and public keys.
     Based on Lecture 7 hybrid_crypto.py, function generate_rsa_keys().
     - RSA key size: 2048 bits (secure, standard)
     - Public exponent: 65537 (common choice for RSA)
+    - If a key_pool (primepool.rsa_key_pool) is given, a pre-generated key is taken from it instead
     Returns:
         private_key, public_key (cryptography objects)
     """
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend()
-    )
+    if key_pool is not None:
+        private_key = key_pool.take(2048)
+    else:
+        private_key = rsa.generate_private_key(
+            public_exponent=65537,
+            key_size=2048,
+            backend=default_backend()
+        )
     public_key = private_key.public_key()
     return private_key, public_key
 
@@ -162,8 +168,9 @@ def decrypt_file(encrypted_message, iv, encrypted_key, private_key):
 # Main Execution / Driver Code
 
 if __name__ == "__main__":
-    # Generate RSA keys (Lecture 7)
-    private_key, public_key = generate_rsa_keys()
+    # Take RSA keys from the pre-generated pool (Lecture 7 key generation runs in the background)
+    key_pool = rsa_key_pool(store_path=KEY_POOL_PATH).start()
+    private_key, public_key = generate_rsa_keys(key_pool)
     
     # Save keys to files
     private_path, public_path = save_rsa_keys(private_key, public_key)
@@ -194,5 +201,8 @@ if __name__ == "__main__":
     
     print(f"Decrypted Message:\n{decrypted_message}\n")
 
+    # Stop the background refill and save the remaining pre-generated keys for next time
+    key_pool.stop()
+
     
 
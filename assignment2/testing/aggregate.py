@@ -0,0 +1,291 @@
+"""
+aggregate.py
+Merges any number of benchmark CSVs in this folder into one table, summarises
+every timing column and renders the log-log plots without a display.
+
+What it replaces:
+- plot.py, which reads only factor_benchmark_results.csv into hand-built lists
+- combined_results.csv, which was put together by hand from VMresults.csv
+  (it is still read as an input, for its plaintext column)
+
+How it works:
+- Rows are joined on case_name; files without one (factor_benchmark_results.csv)
+  get the key_p<p>_q<q> name used by VMresults.csv, so all files line up
+- Every file is parsed once and cached (AGGREGATE_CACHE_PATH). The results are
+  appended to, so on the next run only the bytes added since then are parsed;
+  a file that was rewritten (e.g. factor_benchmark.py starts a new CSV) is
+  detected and parsed again in full
+- For every timing column (*_time, elapsed_s): count, median, 90th/95th
+  percentiles, and least-squares fits of log(time) against bit length and
+  against log(prime gap)
+- Plots are written with matplotlib's Agg backend, so this runs on a server
+
+References:
+- Python csv documentation: https://docs.python.org/3/library/csv.html
+- Matplotlib backends (Agg for headless rendering):
+  https://matplotlib.org/stable/users/explain/figure/backends.html
+"""
+
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import statistics
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+# ----- Configuration -----
+RESULT_FILES = [
+    os.path.join(BASE, "factor_benchmark_results.csv"),
+    os.path.join(BASE, "VMresults.csv"),
+    os.path.join(BASE, "combined_results.csv"),
+]
+AGGREGATE_CACHE_PATH = os.path.join(BASE, "aggregate_cache.json")
+COMBINED_PATH = os.path.join(BASE, "aggregated_results.csv")
+PLOT_FOLDER = os.path.join(BASE, "plots")
+PERCENTILES = (90, 95)
+FINGERPRINT_BYTES = 256   # bytes before the cached offset that must be unchanged for an incremental read
+
+
+# ----- Parsing with a cache -----
+def _fingerprint(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    """
+    Parsed rows of every CSV seen so far, persisted as JSON.
+    Per file: fieldnames, rows, the byte offset parsed up to, and a fingerprint
+    of the header and of the bytes just before that offset.
+    """
+
+    def __init__(self, cache_path=AGGREGATE_CACHE_PATH):
+        self.cache_path = cache_path
+        self.files = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r") as f:
+                self.files = json.load(f)
+
+    def save(self):
+        """Write the cache (temp file + rename, as in primepool.py)."""
+        if not self.cache_path:
+            return
+        temp_path = self.cache_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.files, f)
+        os.replace(temp_path, self.cache_path)
+
+    def _is_unchanged_prefix(self, f, entry):
+        """True if the file still starts with what was parsed last time (it was only appended to)."""
+        offset = entry["offset"]
+        f.seek(0)
+        if _fingerprint(f.readline()) != entry["header_fingerprint"]:
+            return False
+        start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(start)
+        return _fingerprint(f.read(offset - start)) == entry["tail_fingerprint"]
+
+    def rows(self, path):
+        """All rows of a CSV as dicts, parsing only what was appended since the last call."""
+        key = os.path.abspath(path)
+        entry = self.files.get(key)
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if entry is None or size < entry["offset"] or not self._is_unchanged_prefix(f, entry):
+                f.seek(0)
+                header = f.readline()
+                entry = {"fieldnames": next(csv.reader([header.decode("utf-8-sig")]), []),
+                         "rows": [], "offset": f.tell(), "header_fingerprint": _fingerprint(header)}
+            f.seek(entry["offset"])
+            new_data = f.read()
+
+        # Complete lines are parsed and cached; the offset only moves past those
+        complete = new_data[:new_data.rfind(b"\n") + 1]
+        reader = csv.DictReader(io.StringIO(complete.decode("utf-8-sig")), fieldnames=entry["fieldnames"])
+        entry["rows"].extend(row for row in reader if any(row.values()))
+        entry["offset"] += len(complete)
+        with open(path, "rb") as f:
+            start = max(0, entry["offset"] - FINGERPRINT_BYTES)
+            f.seek(start)
+            entry["tail_fingerprint"] = _fingerprint(f.read(entry["offset"] - start))
+        self.files[key] = entry
+
+        # A last line without a newline (VMresults.csv ends like that) is used if it has every
+        # field, but not cached: it may still be being written, so it is parsed again next time
+        partial = next(csv.reader([new_data[len(complete):].decode("utf-8-sig")]), [])
+        if len(partial) == len(entry["fieldnames"]):
+            return entry["rows"] + [dict(zip(entry["fieldnames"], partial))]
+        return entry["rows"]
+
+
+# ----- Merging -----
+def case_key(row):
+    """The join key: case_name, or key_p<p>_q<q> for files that only have p and q."""
+    if row.get("case_name"):
+        return row["case_name"]
+    return f"key_p{row['p']}_q{row['q']}"
+
+
+def merge_results(paths=RESULT_FILES, cache=None):
+    """
+    Merge every CSV into {case_name: row}. Later files (and later rows) add or
+    overwrite columns, so a re-run of one case replaces its older numbers.
+    p, q, bits and gap are filled in from the case name where they are missing.
+    """
+    cache = cache or ResultCache(None)
+    merged = {}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        for row in cache.rows(path):
+            key = case_key(row)
+            merged.setdefault(key, {"case_name": key}).update({k: v for k, v in row.items() if v not in (None, "")})
+
+    for row in merged.values():
+        if "p" not in row and row["case_name"].startswith("key_p") and "_q" in row["case_name"]:
+            p_text, q_text = row["case_name"][len("key_p"):].split("_q", 1)
+            if p_text.isdigit() and q_text.isdigit():
+                row["p"], row["q"] = p_text, q_text
+        if "p" in row:
+            p, q = int(row["p"]), int(row["q"])
+            row.setdefault("n", str(p * q))
+            row.setdefault("bits", str((p * q).bit_length()))
+            row["gap"] = str(abs(q - p))
+    return merged
+
+
+def timing_columns(merged):
+    """Every column holding a time in seconds: <method>_time and elapsed_s (start_time is a timestamp)."""
+    columns = {column for row in merged.values() for column in row} - {"start_time"}
+    return sorted(column for column in columns if column.endswith("_time") or column == "elapsed_s")
+
+
+# ----- Statistics -----
+def percentile(values, percent):
+    """Linear-interpolation percentile of a non-empty list (same as numpy's default)."""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def fit_line(xs, ys):
+    """Least-squares y = slope * x + intercept; None with fewer than two distinct x values."""
+    if len(set(xs)) < 2:
+        return None
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    slope = (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+             / sum((x - mean_x) ** 2 for x in xs))
+    return slope, mean_y - slope * mean_x
+
+
+def _points(merged, column, x_name):
+    """(x, time) pairs with a positive time for one column; x is bits or gap."""
+    points = []
+    for row in merged.values():
+        if row.get(column) and row.get(x_name):
+            value = float(row[column])
+            if value > 0:
+                points.append((int(row[x_name]), value))
+    return sorted(points)
+
+
+def summarise(merged):
+    """
+    Per timing column: count, median, percentiles and two fits:
+    - bits_fit: log10(time) = slope * bits + intercept (growth per bit of n)
+    - gap_fit: log10(time) = slope * log10(gap) + intercept (power law in the gap)
+    """
+    summary = {}
+    for column in timing_columns(merged):
+        times = [float(row[column]) for row in merged.values() if row.get(column)]
+        if not times:
+            continue
+        entry = {"count": len(times), "median": statistics.median(times)}
+        for percent in PERCENTILES:
+            entry[f"p{percent}"] = percentile(times, percent)
+
+        by_bits = _points(merged, column, "bits")
+        entry["bits_fit"] = fit_line([b for b, _ in by_bits], [math.log10(t) for _, t in by_bits])
+        by_gap = [(g, t) for g, t in _points(merged, column, "gap") if g > 0]
+        entry["gap_fit"] = fit_line([math.log10(g) for g, _ in by_gap], [math.log10(t) for _, t in by_gap])
+        summary[column] = entry
+    return summary
+
+
+# ----- Output -----
+def write_combined(merged, path=COMBINED_PATH):
+    """Write the merged table (the generated version of the hand-made combined_results.csv)."""
+    fieldnames = ["case_name"] + sorted({column for row in merged.values() for column in row} - {"case_name"})
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for key in sorted(merged):
+            writer.writerow(merged[key])
+
+
+def render_plots(merged, folder=PLOT_FOLDER, summary=None):
+    """
+    Render time vs prime gap and time vs bit length (log-log, one line per
+    method) to PNG files in folder, without opening a window. Returns the paths.
+    """
+    import matplotlib
+    matplotlib.use("Agg")  # no display needed
+    import matplotlib.pyplot as plt
+
+    summary = summary or summarise(merged)
+    os.makedirs(folder, exist_ok=True)
+    written = []
+    for x_name, x_label, log_x in (("gap", "Prime Gap (|q - p|)", True), ("bits", "Modulus size (bits)", False)):
+        figure, axes = plt.subplots(figsize=(8, 5))
+        for column in summary:
+            points = _points(merged, column, x_name)
+            if log_x:
+                points = [(x, t) for x, t in points if x > 0]
+            if points:
+                axes.plot([x for x, _ in points], [t for _, t in points], "o-", label=column.replace("_", " "))
+        if log_x:
+            axes.set_xscale("log")
+        axes.set_yscale("log")
+        axes.set_xlabel(x_label + (" [log scale]" if log_x else ""))
+        axes.set_ylabel("Time (s) [log scale]")
+        axes.set_title(f"Time vs {x_label}")
+        axes.grid(True, which="both", linestyle="--", linewidth=0.5)
+        if axes.lines:
+            axes.legend()
+        figure.tight_layout()
+        path = os.path.join(folder, f"time_vs_{x_name}.png")
+        figure.savefig(path, dpi=150)
+        plt.close(figure)
+        written.append(path)
+    return written
+
+
+def run_pipeline(paths=RESULT_FILES, cache_path=AGGREGATE_CACHE_PATH, combined_path=COMBINED_PATH,
+                 plot_folder=PLOT_FOLDER):
+    """Parse (incrementally), merge, summarise, write the combined CSV and render the plots."""
+    cache = ResultCache(cache_path)
+    merged = merge_results(paths, cache)
+    cache.save()
+    summary = summarise(merged)
+    write_combined(merged, combined_path)
+    plots = render_plots(merged, plot_folder, summary)
+    return merged, summary, plots
+
+
+if __name__ == "__main__":
+    merged, summary, plots = run_pipeline()
+    print(f"{len(merged)} cases merged into {COMBINED_PATH}")
+    for column, entry in summary.items():
+        percentiles = ", ".join(f"p{p} {entry[f'p{p}']:.4f}" for p in PERCENTILES)
+        line = f" {column}: n={entry['count']}, median {entry['median']:.4f} s, {percentiles}"
+        if entry["gap_fit"]:
+            line += f", time ~ gap^{entry['gap_fit'][0]:.2f}"
+        if entry["bits_fit"]:
+            line += f", x{10 ** entry['bits_fit'][0]:.3f} per bit"
+        print(line)
+    for path in plots:
+        print(" plot:", path)
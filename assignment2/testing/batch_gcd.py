@@ -0,0 +1,192 @@
+"""
+batch_gcd.py
+Bernstein's batch GCD over a folder of RSA public keys: finds every modulus
+that shares a prime with another one and factors it.
+
+Why batch GCD:
+- Two moduli n1 = p*q1 and n2 = p*q2 built from a shared prime (a weak random
+  number generator) are both broken by gcd(n1, n2) = p
+- Checking every pair with primegen.gcd is O(N^2) gcds; the product/remainder
+  tree gets gcd(n_i, product of all other moduli) for every i in quasi-linear time
+
+Method:
+1. P = n_1 * n_2 * ... * n_N (product tree, primegen.product_tree)
+2. z_i = P mod n_i^2 for every i (remainder tree with squared nodes)
+3. g_i = gcd(n_i, z_i / n_i) - a shared prime shows up as 1 < g_i < n_i
+
+Bounded memory:
+- The moduli are split into chunks of BATCH_GCD_CHUNK_SIZE. The tree above the
+  chunks is built over the chunk products only, and each chunk's own tree is
+  built, used and dropped one chunk at a time
+- Every tree level is about as big as all the moduli together (100k RSA-2048
+  keys: ~25 MB), so this keeps log2(N / chunk size) levels in memory instead of
+  log2(N), e.g. 6 instead of 17 for 100k keys in chunks of 2048
+- gmpy2 is used for the big-number arithmetic when it is installed (much faster
+  multiplication and division at these sizes), plain Python ints otherwise
+
+Key files:
+- PEM public keys, private keys and certificates (like keys/rsa_public_key.pem
+  and the key_*.txt files Hack.exe reads)
+- Raw text with the modulus in decimal, as "n = ..." / "modulus = ..." in
+  decimal or 0x-prefixed hex, or as a line of decimal digits
+
+References:
+1. Bernstein, D.J. "How to find smooth parts of integers" (product/remainder trees):
+   https://cr.yp.to/factorization/smoothparts-20040510.pdf
+2. Heninger, Durumeric, Wustrow & Halderman (2012). "Mining Your Ps and Qs:
+   Detection of Widespread Weak Keys in Network Devices". USENIX Security.
+3. Cryptography.io documentation (key serialization): https://cryptography.io/en/latest/
+"""
+
+import math
+import os
+import re
+import sys
+
+try:
+    import gmpy2  # optional, only makes the big multiplications faster
+except ImportError:
+    gmpy2 = None
+
+# primegen.py lives one folder up in assignment2/
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE))
+import primegen as pg
+
+# ----- Configuration -----
+KEY_FOLDER = os.path.join(os.path.dirname(BASE), "keys")
+BATCH_GCD_CHUNK_SIZE = 2048    # moduli per chunk (one chunk's tree is in memory at a time)
+
+PEM_BLOCK = re.compile(rb"-----BEGIN [A-Z ]+-----.+?-----END [A-Z ]+-----", re.DOTALL)
+NAMED_MODULUS = re.compile(rb"^\s*(?:n|modulus)\s*[=:]\s*(0x[0-9a-fA-F]+|\d+)\s*$", re.IGNORECASE | re.MULTILINE)
+DECIMAL_LINE = re.compile(rb"^\s*(\d{20,})\s*$", re.MULTILINE)
+
+_big = gmpy2.mpz if gmpy2 is not None else int
+_gcd = gmpy2.gcd if gmpy2 is not None else math.gcd
+
+
+# ----- Loading keys -----
+def _modulus_from_pem(block):
+    """RSA modulus from one PEM block (public key, private key or certificate), or None."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    loaders = (
+        lambda data: serialization.load_pem_public_key(data),
+        lambda data: serialization.load_pem_private_key(data, password=None),
+        lambda data: x509.load_pem_x509_certificate(data).public_key(),
+    )
+    for load in loaders:
+        try:
+            key = load(block)
+        except (ValueError, TypeError):
+            continue
+        if isinstance(key, rsa.RSAPrivateKey):
+            key = key.public_key()
+        if isinstance(key, rsa.RSAPublicKey):
+            return key.public_numbers().n
+        return None  # a key, but not an RSA one
+    return None
+
+
+def moduli_in_file(path):
+    """Every RSA modulus found in a key file (PEM blocks first, raw numbers otherwise)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    blocks = PEM_BLOCK.findall(data)
+    if blocks:
+        return [n for n in map(_modulus_from_pem, blocks) if n]
+    named = NAMED_MODULUS.findall(data)
+    if named:
+        return [int(value, 0) for value in named]
+    return [int(value) for value in DECIMAL_LINE.findall(data)]
+
+
+def load_moduli(folder, pattern=None):
+    """
+    Yield (file name, modulus) for every key file in folder.
+    - pattern: only file names matching this regular expression (e.g. r"^key_.*\\.txt$")
+    Files without a readable modulus are skipped.
+    """
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path) or (pattern and not re.search(pattern, name)):
+            continue
+        for modulus in moduli_in_file(path):
+            if modulus > 1:
+                yield name, modulus
+
+
+# ----- Batch GCD -----
+def iter_batch_gcd(moduli, chunk_size=BATCH_GCD_CHUNK_SIZE):
+    """
+    Yield gcd(n_i, product of all the other moduli) for each modulus, in order,
+    one chunk at a time.
+
+    1. The product P_C of every chunk C, and a product tree over just those products
+    2. Its remainder tree (squared nodes) gives P mod P_C^2 for every chunk
+    3. Per chunk, the chunk's own remainder tree turns that into P mod n^2 for every n in C
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    moduli = [_big(n) for n in moduli]
+    chunks = [chunk for chunk in (moduli[i:i + chunk_size] for i in range(0, len(moduli), chunk_size)) if chunk]
+    if not chunks:
+        return  # no moduli, nothing to compare
+    chunk_tree = pg.product_tree([pg.product_tree(chunk)[-1][0] for chunk in chunks])
+    product_mod_squares = pg.remainder_tree(chunk_tree[-1][0], chunk_tree, square_leaves=True)
+    del chunk_tree
+
+    for chunk, product_mod_square in zip(chunks, product_mod_squares):
+        tree = pg.product_tree(chunk)
+        for n, remainder in zip(chunk, pg.remainder_tree(product_mod_square, tree, square_leaves=True)):
+            yield int(_gcd(n, remainder // n))
+
+
+def batch_gcd(moduli, chunk_size=BATCH_GCD_CHUNK_SIZE):
+    """List version of iter_batch_gcd."""
+    return list(iter_batch_gcd(moduli, chunk_size))
+
+
+def find_shared_factors(named_moduli, chunk_size=BATCH_GCD_CHUNK_SIZE):
+    """
+    Factor every modulus that shares a prime with another one.
+
+    named_moduli: (name, modulus) pairs, e.g. from load_moduli.
+    Returns a list of dicts with name, modulus, p, q. Moduli that share both
+    primes (g = n) are split with a direct gcd against the other flagged
+    moduli; exact duplicates are reported with p = q = None.
+    """
+    named_moduli = list(named_moduli)
+    moduli = [n for _, n in named_moduli]
+    shared = batch_gcd(moduli, chunk_size)
+
+    flagged = [i for i, g in enumerate(shared) if g > 1]
+    report = []
+    for i in flagged:
+        name, n = named_moduli[i]
+        factor = shared[i]
+        if factor == n:
+            # Both primes are shared: the partner moduli are among the flagged ones
+            factor = next((g for g in (math.gcd(n, moduli[j]) for j in flagged if j != i) if 1 < g < n), None)
+        if factor is None:
+            report.append({"name": name, "modulus": n, "p": None, "q": None})
+        else:
+            p, q = sorted((factor, n // factor))
+            report.append({"name": name, "modulus": n, "p": p, "q": q})
+    return report
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1] if len(sys.argv) > 1 else KEY_FOLDER
+    named_moduli = list(load_moduli(folder))
+    print(f"Loaded {len(named_moduli)} RSA moduli from {folder}")
+
+    broken = find_shared_factors(named_moduli)
+    for entry in broken:
+        if entry["p"] is None:
+            print(f" {entry['name']}: modulus repeated in another key (no factor)")
+        else:
+            print(f" {entry['name']}: p = {entry['p']}, q = {entry['q']}")
+    print(f"{len(broken)} of {len(named_moduli)} moduli share a prime with another key.")
@@ -0,0 +1,48 @@
+"""
+batch_prime_benchmark.py
+Compares primegen.is_prime_batch against testing one number at a time
+(the loop large_primegen.py used to run).
+"""
+
+import os
+import sys
+import random
+import time
+
+import numpy as np
+
+# primegen.py lives one folder up in assignment2/
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE))
+import primegen as pg
+
+# ----- Configuration -----
+STUDENT_ID = 4101575
+RANGE_WIDTH = 10000
+REPEATS = 3  # best of REPEATS is reported
+
+random.seed(STUDENT_ID)
+cases = {
+    f"ID ±{RANGE_WIDTH} (range)": range(STUDENT_ID - RANGE_WIDTH, STUDENT_ID + RANGE_WIDTH + 1),
+    "1M range near 2^31": range(2**31, 2**31 + 1000000),
+    "50k random 32-bit": [random.getrandbits(32) for _ in range(50000)],
+    "20k random 48-bit": [random.getrandbits(48) for _ in range(20000)],
+}
+
+
+def best_time(function):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        value = function()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+for name, candidates in cases.items():
+    loop_time, loop_mask = best_time(lambda: [pg.is_probable_prime(n) for n in candidates])
+    batch_time, batch_mask = best_time(lambda: pg.is_prime_batch(candidates))
+    if not np.array_equal(np.array(loop_mask), batch_mask):
+        raise AssertionError(f"is_prime_batch disagrees with the per-element loop for {name}")
+    print(f"{name:<26} loop {loop_time:8.3f} s   batch {batch_time:8.3f} s   x{loop_time / batch_time:.1f}"
+          f"   ({int(batch_mask.sum())} primes)")
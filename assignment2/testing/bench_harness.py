@@ -0,0 +1,230 @@
+"""
+bench_harness.py
+Parallel, resumable version of factor_benchmark.py.
+
+Differences from factor_benchmark.py:
+- Cases are generated from a spec (modulus sizes, prime gaps, factor
+  imbalance) instead of a fixed prime_pairs list
+- Every (case, method) pair runs in its own worker process, several at once,
+  and is killed after a timeout instead of stalling the whole run
+- Each measurement is the median of several time.perf_counter_ns() trials
+  after one untimed warm-up call, plus how far the worker's peak resident
+  memory (RSS) rose above its level at start
+- Results are appended to a JSON Lines store as soon as they finish, so an
+  interrupted run picks up where it stopped; the CSV for plot.py is rebuilt
+  from the store at the end
+
+References:
+- Python multiprocessing documentation (Process, Pipe, connection.wait):
+  https://docs.python.org/3/library/multiprocessing.html
+- Python resource module (getrusage, ru_maxrss): https://docs.python.org/3/library/resource.html
+"""
+
+import csv
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import random
+import statistics
+import sys
+import time
+
+try:
+    import resource  # Unix only; peak RSS is left empty elsewhere
+except ImportError:
+    resource = None
+
+from sympy import factorint
+
+# sieve.py lives one folder up in assignment2/
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE))
+from sieve import next_prime
+from factor_benchmark import trial_division, pollards_rho, fermat_factor
+from ecm import ecm_factor
+from siqs import siqs_factor
+
+# ----- Configuration -----
+CASE_SPEC = {
+    "bits": [44, 64, 88],            # size of n
+    "gaps": [2, 10000, 1000000],     # q - p for "close primes" cases (q = next prime after p + gap)
+    "imbalances": [8, 16],           # extra bits of q over p for "unbalanced" cases
+    "samples": 1,                    # cases per combination
+    "seed": 4101575,                 # same spec + seed = same cases, so a resumed run matches
+}
+STORE_PATH = os.path.join(BASE, "factor_benchmark_results.jsonl")   # append-only checkpoint
+CSV_PATH = os.path.join(BASE, "factor_benchmark_results.csv")       # what plot.py reads
+TIMEOUT_S = 60        # per (case, method), warm-up and all repeats together
+REPEATS = 3           # trials per measurement, the median is reported
+
+# Same column names as factor_benchmark.py ("<method>_time"); ECM runs one curve
+# at a time here, the harness itself supplies the parallelism
+METHODS = {
+    "sympy": factorint,
+    "trial": trial_division,
+    "pollard": pollards_rho,
+    "fermat": fermat_factor,
+    "ecm": lambda n: ecm_factor(n, processes=1),
+    "siqs": siqs_factor,
+}
+
+
+# ----- Cases -----
+def _random_prime(bits, rng):
+    return next_prime(rng.getrandbits(bits) | (1 << (bits - 1)))
+
+
+def generate_cases(spec=CASE_SPEC):
+    """
+    List of cases (dicts with case_name, p, q, n, bits, kind) for a spec:
+    - "gap" cases: p random of half the size, q the next prime after p + gap
+    - "imbalance" cases: p and q random, q with 'imbalance' more bits than p
+    """
+    rng = random.Random(spec.get("seed"))
+    cases = []
+    for bits in spec["bits"]:
+        for _ in range(spec.get("samples", 1)):
+            for gap in spec.get("gaps", []):
+                p = _random_prime(bits // 2, rng)
+                cases.append((p, next_prime(p + gap - 1), f"gap {gap}"))
+            for imbalance in spec.get("imbalances", []):
+                p_bits = (bits - imbalance) // 2
+                cases.append((_random_prime(p_bits, rng), _random_prime(bits - p_bits, rng), f"imbalance {imbalance}"))
+    return [{"case_name": f"key_p{p}_q{q}", "p": p, "q": q, "n": p * q, "bits": (p * q).bit_length(), "kind": kind}
+            for p, q, kind in cases]
+
+
+# ----- Worker -----
+def _measure(method, n, repeats, connection):
+    """
+    Runs inside the worker process: time 'repeats' calls and send the results back.
+
+    - One untimed warm-up call first, so the median is not mixed with a cold
+      first trial (lazy prime tables, imports, caches)
+    - ru_maxrss is a high-water mark and a forked worker starts with the
+      parent's pages already counted, so the baseline taken here is subtracted:
+      peak_rss_kb is how much the method raised the peak (the warm-up included)
+    """
+    baseline_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None  # kB on Linux
+    try:
+        METHODS[method](n)  # warm-up
+        trials_ns = []
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            result = METHODS[method](n)
+            trials_ns.append(time.perf_counter_ns() - start)
+        status = "ok"
+    except Exception as error:
+        trials_ns, result, status = [], None, f"error: {error!r}"
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss_kb if resource else None
+    connection.send({"trials_ns": trials_ns, "result": str(result), "status": status, "peak_rss_kb": peak_rss_kb})
+    connection.close()
+
+
+# ----- Checkpoint store -----
+def load_store(store_path=STORE_PATH):
+    """Finished measurements by (case_name, method); a half-written last line is ignored."""
+    done = {}
+    if os.path.exists(store_path):
+        with open(store_path, "r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # interrupted while writing this line
+                done[(record["case_name"], record["method"])] = record
+    return done
+
+
+def _append_record(store_path, record):
+    with open(store_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+        f.flush()
+        os.fsync(f.fileno())  # a crash right after still keeps this result
+
+
+# ----- Runner -----
+def run_benchmark(cases, methods=None, store_path=STORE_PATH, processes=None, timeout=TIMEOUT_S, repeats=REPEATS):
+    """
+    Measure every (case, method) pair not yet in the store, up to 'processes'
+    workers at a time (default one per core), and append each result to the store.
+    Returns the full store (old and new results).
+    """
+    methods = methods or list(METHODS)
+    processes = processes or os.cpu_count() or 1
+    done = load_store(store_path)
+    pending = [(case, method) for case in cases for method in methods
+               if (case["case_name"], method) not in done]
+    print(f"{len(pending)} measurements to run ({len(done)} already in {os.path.basename(store_path)})")
+
+    running = {}  # connection -> (case, method, process, deadline)
+    while pending or running:
+        while pending and len(running) < processes:
+            case, method = pending.pop(0)
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            worker = multiprocessing.Process(target=_measure, args=(method, case["n"], repeats, sender), daemon=True)
+            worker.start()
+            sender.close()  # the worker holds the only sending end now
+            running[receiver] = (case, method, worker, time.monotonic() + timeout)
+
+        next_deadline = min(deadline for _, _, _, deadline in running.values())
+        ready = multiprocessing.connection.wait(list(running), timeout=max(0, next_deadline - time.monotonic()))
+        now = time.monotonic()
+        for receiver in list(running):
+            case, method, worker, deadline = running[receiver]
+            if receiver in ready:
+                try:
+                    outcome = receiver.recv()
+                except EOFError:  # the worker died without reporting (e.g. killed for memory)
+                    outcome = {"trials_ns": [], "result": None, "status": "crashed", "peak_rss_kb": None}
+            elif now >= deadline:
+                worker.terminate()
+                outcome = {"trials_ns": [], "result": None, "status": "timeout", "peak_rss_kb": None}
+            else:
+                continue
+            worker.join()
+            receiver.close()
+            del running[receiver]
+
+            record = {
+                "case_name": case["case_name"], "method": method,
+                "p": case["p"], "q": case["q"], "bits": case["bits"], "kind": case["kind"],
+                "median_ns": int(statistics.median(outcome["trials_ns"])) if outcome["trials_ns"] else None,
+                "repeats": repeats, "timeout_s": timeout, **outcome,
+            }
+            _append_record(store_path, record)
+            done[(case["case_name"], method)] = record
+            median = f"{record['median_ns'] / 1e9:.4f} s" if record["median_ns"] is not None else record["status"]
+            print(f" {case['case_name']} {method}: {median}")
+    return done
+
+
+def export_csv(cases, done, methods=None, csv_path=CSV_PATH):
+    """
+    Write one row per case with the columns factor_benchmark.py writes
+    (p, q, n, bits, <method>_time in seconds) plus <method>_peak_rss_kb
+    (peak RSS increase over the worker's start, see _measure).
+    Timed-out or failed measurements are left empty.
+    """
+    methods = methods or list(METHODS)
+    fieldnames = ["p", "q", "n", "bits"] + [f"{m}_time" for m in methods] + [f"{m}_peak_rss_kb" for m in methods]
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for case in cases:
+            row = {"p": case["p"], "q": case["q"], "n": case["n"], "bits": case["bits"]}
+            for method in methods:
+                record = done.get((case["case_name"], method), {})
+                median_ns = record.get("median_ns")
+                row[f"{method}_time"] = round(median_ns / 1e9, 6) if median_ns is not None else ""
+                peak_rss_kb = record.get("peak_rss_kb")
+                row[f"{method}_peak_rss_kb"] = peak_rss_kb if peak_rss_kb is not None else ""
+            writer.writerow(row)
+
+
+if __name__ == "__main__":
+    cases = generate_cases(CASE_SPEC)
+    done = run_benchmark(cases)
+    export_csv(cases, done)
+    print(f"\n✅ Results written to {CSV_PATH} (checkpoint: {STORE_PATH})")
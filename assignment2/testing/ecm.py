@@ -0,0 +1,215 @@
+"""
+ecm.py
+Lenstra's elliptic-curve method (ECM) for factor_benchmark.py, in pure Python.
+
+Why ECM:
+- Its running time depends on the size of the *smallest* factor p, not on n,
+  so it suits unbalanced moduli such as 1000003 * 999004247 that Fermat
+  cannot handle and that are slow for rho
+- Each curve is an independent random trial, so curves run in parallel
+
+Method:
+- Montgomery curves B*y^2 = x^3 + A*x^2 + x, using only X:Z coordinates
+  (Suyama's parametrisation picks the curve and start point from a random sigma)
+- Stage 1: multiply the point by every prime power <= B1 (Montgomery ladder)
+- Stage 2: baby-step/giant-step "prime continuation" catches one extra prime
+  in (B1, B2], with one multiplication per prime
+- A factor shows up as gcd(Z, n) > 1
+
+References:
+1. Crandall & Pomerance, "Prime Numbers: A Computational Perspective", 2nd ed.,
+   Algorithm 7.4.4 (ECM with Montgomery coordinates, stage 1 and 2)
+2. Montgomery, P.L. (1987). "Speeding the Pollard and Elliptic Curve Methods of Factorization".
+   Mathematics of Computation 48(177).
+3. GMP-ECM README, table of optimal B1 values per factor size:
+   https://gitlab.inria.fr/zimmerma/ecm
+"""
+
+import math
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# primegen.py and sieve.py live one folder up in assignment2/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import primegen as pg
+from sieve import iter_primes
+
+# (factor digits, B1, B2, curves) - smaller rows of the GMP-ECM table
+ECM_PARAMETERS = [
+    (10, 360, 36000, 8),
+    (15, 2000, 200000, 25),
+    (20, 11000, 1100000, 90),
+    (25, 50000, 5000000, 300),
+    (30, 250000, 25000000, 700),
+]
+STAGE2_GIANT_STEP = 105  # D: giant steps of 2*D, baby steps S_d = [2d]Q for d = 1..D
+
+
+class FactorFound(Exception):
+    """Raised inside a curve computation when an inversion exposes a factor of n."""
+
+    def __init__(self, factor):
+        super().__init__(factor)
+        self.factor = factor
+
+
+# ----- Montgomery curve arithmetic (X:Z coordinates, everything mod n) -----
+def _double(x, z, a24, n):
+    """[2]P, where a24 = (A + 2) / 4."""
+    sum_squared = (x + z) * (x + z) % n
+    diff_squared = (x - z) * (x - z) % n
+    product = sum_squared - diff_squared
+    return sum_squared * diff_squared % n, product * (diff_squared + a24 * product) % n
+
+
+def _add(xp, zp, xq, zq, xd, zd, n):
+    """P + Q, given the difference D = P - Q."""
+    u = (xp - zp) * (xq + zq) % n
+    v = (xp + zp) * (xq - zq) % n
+    return zd * (u + v) * (u + v) % n, xd * (u - v) * (u - v) % n
+
+
+def _multiply(k, x, z, a24, n):
+    """[k]P with the Montgomery ladder (k >= 1)."""
+    if k == 1:
+        return x, z
+    x0, z0 = x, z                       # R0 = [m]P
+    x1, z1 = _double(x, z, a24, n)      # R1 = [m+1]P, so R1 - R0 = P throughout
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x0, z0 = _add(x1, z1, x0, z0, x, z, n)
+            x1, z1 = _double(x1, z1, a24, n)
+        else:
+            x1, z1 = _add(x1, z1, x0, z0, x, z, n)
+            x0, z0 = _double(x0, z0, a24, n)
+    return x0, z0
+
+
+def _suyama_curve(sigma, n):
+    """Curve constant a24 and start point (x, z) for Suyama's parametrisation."""
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    x = u * u * u % n
+    z = v * v * v % n
+    denominator = 16 * x * v % n
+    g = math.gcd(denominator, n)
+    if g != 1:
+        raise FactorFound(g)
+    a24 = pow(v - u, 3, n) * (3 * u + v) % n * pg.mod_inverse(denominator, n) % n
+    return a24, x, z
+
+
+# ----- One curve -----
+def ecm_one_curve(n, B1, B2, sigma):
+    """
+    Run stage 1 and stage 2 on the curve chosen by sigma.
+    Returns a non-trivial factor of n or None.
+    """
+    try:
+        a24, x, z = _suyama_curve(sigma, n)
+    except FactorFound as found:
+        return found.factor if found.factor != n else None
+
+    # Stage 1: Q = [k]P with k = product of all prime powers <= B1
+    for p in pg.small_primes_below(B1 + 1):
+        prime_power = p
+        while prime_power * p <= B1:
+            prime_power *= p
+        x, z = _multiply(prime_power, x, z, a24, n)
+    g = math.gcd(z, n)
+    if g == n:
+        return None
+    if g > 1:
+        return g
+
+    # Stage 2: baby steps S_d = [2d]Q and beta_d = X(S_d) * Z(S_d)
+    D = STAGE2_GIANT_STEP
+    baby_steps = [None] * (D + 1)
+    baby_steps[1] = _double(x, z, a24, n)
+    baby_steps[2] = _double(*baby_steps[1], a24, n)
+    for d in range(3, D + 1):
+        baby_steps[d] = _add(*baby_steps[d - 1], *baby_steps[1], *baby_steps[d - 2], n)
+    beta = [None] + [bx * bz % n for bx, bz in baby_steps[1:]]
+
+    # Giant steps: R = [r]Q for odd r = B, B + 2D, ..., T = [r - 2D]Q
+    B = B1 - 1 if B1 % 2 == 0 else B1
+    rx, rz = _multiply(B, x, z, a24, n)
+    tx, tz = _multiply(abs(B - 2 * D), x, z, a24, n)  # B is odd, so never [0]Q
+    accumulated = 1
+    primes = iter_primes(B + 2, B2 + 1)
+    prime = next(primes, None)
+    r = B
+    while prime is not None and r < B2:
+        alpha = rx * rz % n
+        while prime is not None and prime <= r + 2 * D:
+            delta = (prime - r) // 2
+            sx, sz = baby_steps[delta]
+            accumulated = accumulated * ((rx - sx) * (rz + sz) - alpha + beta[delta]) % n
+            prime = next(primes, None)
+        (rx, rz), (tx, tz) = _add(rx, rz, *baby_steps[D], tx, tz, n), (rx, rz)
+        r += 2 * D
+    g = math.gcd(accumulated, n)
+    return g if 1 < g < n else None
+
+
+# ----- Driver -----
+def _parameters_for(B1, B2, curves):
+    """The (B1, B2, curves) levels to try: one fixed level if B1 is given, else the whole table."""
+    if B1 is not None:
+        return [(B1, B2 or 100 * B1, curves or 100)]
+    return [(b1, b2, c) for _, b1, b2, c in ECM_PARAMETERS]
+
+
+def ecm_factor(n, B1=None, B2=None, curves=None, processes=None, seed=None):
+    """
+    Find a non-trivial factor of n with ECM, or return None.
+
+    - B1, B2, curves: fixed bounds; by default the GMP-ECM levels for 10- to
+      30-digit factors are tried in turn
+    - processes: curves run in parallel in this many worker processes
+      (default one per core; 1 runs everything in this process)
+    - seed: seed for the random curve choices (for repeatable benchmarks)
+    As soon as one curve finds a factor it is returned: the queued curves are
+    cancelled and the running ones are not waited for.
+    """
+    if n % 2 == 0:
+        return 2 if n > 2 else None
+    if n < 4 or pg.is_probable_prime(n):
+        return None
+    rng = random.Random(seed)
+    processes = processes or os.cpu_count() or 1
+
+    for level_B1, level_B2, level_curves in _parameters_for(B1, B2, curves):
+        sigmas = [rng.randrange(6, n - 1) for _ in range(level_curves)]
+        if processes == 1:
+            for sigma in sigmas:
+                factor = ecm_one_curve(n, level_B1, level_B2, sigma)
+                if factor:
+                    return factor
+            continue
+
+        # Not a with-block: its exit would wait for every curve still running after a factor is found
+        pool = ProcessPoolExecutor(max_workers=processes)
+        try:
+            pending = set()
+            sigma_iter = iter(sigmas)
+            for sigma in sigma_iter:  # keep every worker busy, plus one queued curve each
+                pending.add(pool.submit(ecm_one_curve, n, level_B1, level_B2, sigma))
+                if len(pending) >= 2 * processes:
+                    break
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    factor = future.result()
+                    if factor:
+                        return factor
+                for sigma in sigma_iter:
+                    pending.add(pool.submit(ecm_one_curve, n, level_B1, level_B2, sigma))
+                    if len(pending) >= 2 * processes:
+                        break
+        finally:
+            # return straight away: drop the queued curves and do not wait for the running ones
+            pool.shutdown(wait=False, cancel_futures=True)
+    return None
@@ -0,0 +1,214 @@
+"""
+factor.py
+factor(n): full prime factorisation that picks its methods automatically,
+instead of running every method in factor_benchmark.py to completion.
+
+How it works:
+- Small factors (below 1000) are divided out directly, and small n are
+  handled in-process with Brent's rho (starting worker processes would cost more)
+- Larger n first get a short in-process ECM pass (the 10-digit level), which
+  finds factors up to ~10 digits in a fraction of a second
+- Otherwise choose_methods() ranks the methods by n's size and any hints
+  (primes near a base ID favour Fermat, a suspected small factor favours
+  trial division / rho / ECM, balanced large n favour SIQS)
+- The top methods race in separate worker processes under one shared deadline;
+  the first factor wins and the other workers are terminated
+- Both halves are factored again until only primes are left
+
+References:
+1. Crandall & Pomerance, "Prime Numbers: A Computational Perspective", 2nd ed.,
+   Chapter 5-7 (which method suits which kind of n)
+2. Python multiprocessing documentation (Process, Queue, terminate):
+   https://docs.python.org/3/library/multiprocessing.html
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+
+# primegen.py lives one folder up in assignment2/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import primegen as pg
+from factor_benchmark import trial_division, pollards_rho, fermat_factor
+from ecm import ECM_PARAMETERS, ecm_factor
+from siqs import siqs_factor
+
+SMALL_FACTOR_LIMIT = 1000          # divided out before anything else
+IN_PROCESS_BITS = 40               # n below this size is factored without workers
+TRIAL_DIVISION_LIMIT = 2000000     # same bound factor_benchmark.py uses
+FERMAT_RACE_STEPS = 10 ** 8        # Fermat runs until the deadline (or another method wins)
+RHO_RACE_ATTEMPTS = 1000
+SIQS_FIRST_BITS = 60               # above this, SIQS leads the race (the ECM pre-pass has taken the small factors)
+
+
+# ----- Methods, all with the same signature (n, seed) -----
+def _trial(n, seed):
+    return trial_division(n, min(TRIAL_DIVISION_LIMIT, math.isqrt(n) + 1))
+
+
+def _rho(n, seed):
+    random.seed(seed)  # only used for the retries after the first polynomial
+    return pollards_rho(n, max_attempts=RHO_RACE_ATTEMPTS)
+
+
+def _fermat(n, seed):
+    return fermat_factor(n, max_iter=FERMAT_RACE_STEPS)
+
+
+def _ecm(n, seed):
+    return ecm_factor(n, processes=1, seed=seed)  # one curve at a time inside a race worker
+
+
+def _siqs(n, seed):
+    return siqs_factor(n, seed=seed)
+
+
+FACTORING_METHODS = {
+    "trial": _trial,
+    "rho": _rho,
+    "fermat": _fermat,
+    "ecm": _ecm,
+    "siqs": _siqs,
+}
+
+
+def choose_methods(n, base=None, small_factor_bound=None):
+    """
+    Rank the methods for n, most promising first.
+
+    - base: n is expected to be a product of primes near this value (e.g. a
+      student ID), so Fermat, which starts at sqrt(n), goes first
+    - small_factor_bound: one factor is suspected to be below this bound
+    Without hints the ranking follows n's size: rho while factors can still be
+    small, SIQS first above SIQS_FIRST_BITS. The order matters on machines with
+    few cores, where find_factor runs the methods largely one after another:
+    rho alone can spend over a minute giving up on a 100-bit n that SIQS splits
+    in under a second.
+    """
+    bits = n.bit_length()
+    ranked = []
+    if base is not None and abs(math.isqrt(n) - base) <= base:
+        ranked.append("fermat")
+    if small_factor_bound is not None:
+        if small_factor_bound <= TRIAL_DIVISION_LIMIT:
+            ranked.append("trial")
+        ranked += ["rho", "ecm"]
+
+    if bits <= SIQS_FIRST_BITS:
+        ranked += ["rho", "fermat", "trial", "siqs", "ecm"]
+    else:
+        ranked += ["siqs", "ecm", "rho", "fermat", "trial"]
+    return list(dict.fromkeys(ranked))  # drop repeats, keep the order
+
+
+def _race_worker(method, n, seed, result_queue):
+    try:
+        factor = FACTORING_METHODS[method](n, seed)
+    except Exception:  # a failing method just drops out of the race
+        factor = None
+    result_queue.put((method, factor))
+
+
+def find_factor(n, methods=None, deadline=None, processes=None, seed=None):
+    """
+    Race the given methods (default: all, in choose_methods order) on n and return
+    the first non-trivial factor, or None if they all give up or the deadline passes.
+
+    - deadline: time.monotonic() value after which the race is abandoned
+    - processes: at most this many methods race at once (default one per core)
+    """
+    methods = methods or choose_methods(n)
+    processes = processes or os.cpu_count() or 1
+    rng = random.Random(seed)
+    result_queue = multiprocessing.Queue()
+    workers = {}
+    waiting = list(methods)
+
+    def start_next():
+        method = waiting.pop(0)
+        worker = multiprocessing.Process(target=_race_worker,
+                                         args=(method, n, rng.randrange(1 << 32), result_queue),
+                                         daemon=True)
+        worker.start()
+        workers[method] = worker
+
+    try:
+        while waiting and len(workers) < processes:
+            start_next()
+        while workers:
+            timeout = 1 if deadline is None else min(1, deadline - time.monotonic())
+            if timeout <= 0:
+                return None
+            try:
+                method, factor = result_queue.get(timeout=timeout)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in workers.values()):
+                    raise RuntimeError("All factoring workers exited unexpectedly.")
+                continue
+            workers.pop(method).join()
+            if factor and 1 < factor < n and n % factor == 0:
+                return factor
+            if waiting:
+                start_next()  # this method gave up, give its core to the next one
+        return None
+    finally:
+        for worker in workers.values():
+            worker.terminate()  # the losers have nothing worth waiting for
+            worker.join()
+        result_queue.cancel_join_thread()
+        result_queue.close()
+
+
+def factor(n, timeout=None, base=None, small_factor_bound=None, processes=None, seed=None):
+    """
+    Full prime factorisation of n as {prime: exponent} (the same shape as sympy.factorint).
+
+    - timeout: seconds for the whole factorisation; TimeoutError if it runs out
+    - base, small_factor_bound: hints passed to choose_methods
+    - processes: maximum number of racing worker processes
+    """
+    if n < 1:
+        raise ValueError("n must be a positive integer.")
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    factors = {}
+
+    for p in pg.small_primes_below(SMALL_FACTOR_LIMIT):
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+
+    composites = [n] if n > 1 else []
+    while composites:
+        m = composites.pop()
+        if pg.is_probable_prime(m, mode="bpsw"):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        root = math.isqrt(m)
+        if root * root == m:
+            composites += [root, root]
+            continue
+        if m.bit_length() < IN_PROCESS_BITS:
+            d = pollards_rho(m, max_attempts=RHO_RACE_ATTEMPTS)
+        else:
+            _, B1, B2, curves = ECM_PARAMETERS[0]
+            d = ecm_factor(m, B1, B2, curves, processes=1, seed=seed)
+            if d is None:
+                methods = choose_methods(m, base, small_factor_bound)
+                d = find_factor(m, methods, deadline, processes, seed)
+        if d is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"No factor of {m} found within {timeout} s.")
+            raise ArithmeticError(f"Every method gave up on {m}.")
+        composites += [d, m // d]
+    return dict(sorted(factors.items()))
+
+
+if __name__ == "__main__":
+    # Benchmark moduli: primes near a student ID, and the far-apart pair from build_test_n.py
+    for n in (4101571 * 4101593, 1000003 * 999004247, 2 ** 4 * 3 * 4101571 * 4101593 * 999004247):
+        start = time.time()
+        print(n, factor(n, timeout=60, base=4101575), round(time.time() - start, 4), "s")
@@ -1,6 +1,20 @@
+import os
+import sys
 import time
 import csv
-from sympy import isprime, nextprime, prevprime, factorint
+import math
+import bisect
+import random
+from sympy import factorint
+
+import numpy as np
+
+# sieve.py lives one folder up in assignment2/ (replaces sympy's nextprime/prevprime)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sieve import next_prime as nextprime, prev_prime as prevprime
+import primegen as pg
+from ecm import ecm_factor
+from siqs import siqs_factor
 
 # ----- Configuration -----
 # Base number ~ your student ID (example: 4101575)
@@ -16,34 +30,202 @@ prime_pairs = [
 ]
 
 # ----- Factorization Methods -----
+TRIAL_BLOCK_SIZE = 1 << 14        # primes per vectorised NumPy block
+TRIAL_PRODUCT_PRIMES = 512        # primes multiplied together for one big-int gcd
+TRIAL_BATCH_CELLS = 1 << 18       # moduli x primes compared at once in batch mode
+_trial_tables = {}                # power-of-two limit -> cached prime table (see _trial_table)
+
+def _trial_table(limit):
+    """
+    Primes in every form the trial division needs: the list, a NumPy int64 array,
+    and chunks of TRIAL_PRODUCT_PRIMES primes with their products. The product
+    tree over the chunk products (a few megabits at the top) is only built when
+    batch_trial_division first needs it.
+
+    Like pg.small_primes_below, tables are only built for power-of-two limits, so
+    the cache stays small whatever limits callers pass. Returns (table, count):
+    the primes below limit are the first count entries of the table.
+    """
+    table_limit = 1 << max(limit - 1, 1).bit_length()  # next power of two >= limit
+    table = _trial_tables.get(table_limit)
+    if table is None:
+        primes = pg.small_primes_below(table_limit)
+        chunks = [primes[i:i + TRIAL_PRODUCT_PRIMES] for i in range(0, len(primes), TRIAL_PRODUCT_PRIMES)]
+        chunk_products = [pg.product_tree(chunk)[-1][0] for chunk in chunks]
+        table = {
+            "primes": primes,
+            "array": np.array(primes, dtype=np.int64),
+            "chunks": chunks,
+            "chunk_products": chunk_products,
+            "tree": None,
+        }
+        _trial_tables[table_limit] = table
+    return table, bisect.bisect_left(table["primes"], limit)
+
+def _first_prime_divisor(n, chunk):
+    for p in chunk:
+        if n % p == 0:
+            return p
+    return None
+
 def trial_division(n, limit=2000000):
-    for i in range(2, limit):
-        if n % i == 0:
-            return i
+    """
+    Smallest prime factor of n below limit, or None.
+
+    Only primes are tried (a cached table), never evens or other composites:
+    - n below 2^63: the table is checked in NumPy blocks, n % block in one step
+    - bigger n: for each chunk of primes, gcd(n mod (p1*p2*...*pk), p1*p2*...*pk)
+      tells whether any of them divides n, and only such a chunk is searched
+    """
+    table, count = _trial_table(limit)
+    if 0 < n < (1 << 63):
+        primes = table["array"][:count]
+        for start in range(0, count, TRIAL_BLOCK_SIZE):
+            block = primes[start:start + TRIAL_BLOCK_SIZE]
+            hits = np.flatnonzero(np.int64(n) % block == 0)
+            if hits.size:
+                return int(block[hits[0]])
+        return None
+    for chunk, product in zip(table["chunks"], table["chunk_products"]):
+        if chunk[0] >= limit:
+            break
+        if gcd(n % product, product) > 1:
+            p = _first_prime_divisor(n, chunk)
+            return p if p < limit else None  # later chunks only hold bigger primes
     return None
 
-def pollards_rho(n):
+def batch_trial_division(moduli, limit=2000000):
+    """
+    trial_division for many moduli against the same prime table; returns a list
+    with the smallest prime factor below limit (or None) for each modulus.
+
+    - Moduli below 2^63 are compared with whole blocks of primes at once
+      (a moduli x primes NumPy array of at most TRIAL_BATCH_CELLS entries)
+    - Bigger moduli are handled with a remainder tree: the product P of all table
+      primes is reduced modulo every modulus at once by walking down the product
+      tree of the moduli, then gcd(n, P mod n) is the product of n's small primes
+    """
+    moduli = [int(n) for n in moduli]
+    table, count = _trial_table(limit)
+    primes = table["array"][:count]
+    results = [2 if n == 0 else None for n in moduli]
+
+    small = [i for i, n in enumerate(moduli) if 0 < n < (1 << 63)]
+    rows = max(1, TRIAL_BATCH_CELLS // TRIAL_BLOCK_SIZE)
+    for row_start in range(0, len(small), rows):
+        indices = np.array(small[row_start:row_start + rows])
+        values = np.array([moduli[i] for i in indices], dtype=np.int64)
+        for start in range(0, count, TRIAL_BLOCK_SIZE):
+            if not indices.size:
+                break
+            block = primes[start:start + TRIAL_BLOCK_SIZE]
+            divides = values[:, None] % block[None, :] == 0
+            found = divides.any(axis=1)
+            for index, column in zip(indices[found], divides[found].argmax(axis=1)):
+                results[index] = int(block[column])
+            indices, values = indices[~found], values[~found]
+
+    big = [i for i, n in enumerate(moduli) if abs(n) >= (1 << 63) or n < 0]
+    if big and count:  # with no primes below limit there is nothing to find
+        if table["tree"] is None:
+            table["tree"] = pg.product_tree(table["chunk_products"])
+        all_primes_product = table["tree"][-1][0]
+        remainders = pg.remainder_tree(all_primes_product, pg.product_tree([abs(moduli[i]) for i in big]))
+        for i, remainder in zip(big, remainders):
+            shared = gcd(abs(moduli[i]), remainder)  # product of the table primes dividing this modulus
+            # (the table may reach past limit; trial_division(shared, limit) drops those primes)
+            if shared > 1:
+                results[i] = trial_division(shared, limit)
+    return results
+
+def pollards_rho(n, max_attempts=20, block_size=128):
+    """
+    Brent's variant of Pollard's rho.
+
+    - Brent cycle detection: y runs ahead in power-of-two stretches instead of
+      Floyd's x/y pair, so f is evaluated about 1/3 fewer times
+    - |x - y| values are multiplied together mod n over a block of steps and
+      only one gcd is taken per block
+    - If a block collapses (gcd == n) the block is replayed one step at a time
+      from its start to find the factor it skipped past
+    - If that still gives n, retry with a new constant c and seed (the first
+      attempt uses the classic f(x) = x*x + 1, x = 2)
+
+    Returns a non-trivial factor, or None only for 1, primes, or after max_attempts failures.
+    """
     if n % 2 == 0:
-        return 2
-    x = 2; y = 2; d = 1
-    f = lambda x: (x*x + 1) % n
-    while d == 1:
-        x = f(x)
-        y = f(f(y))
-        d = gcd(abs(x - y), n)
-    return None if d == n else d
+        return 2 if n > 2 else None
+    if n < 4 or pg.is_probable_prime(n):
+        return None
+
+    c, y = 1, 2
+    for _ in range(max_attempts):
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y*y + c) % n
+            k = 0
+            while k < r and g == 1:
+                block_start = y
+                for _ in range(min(block_size, r - k)):
+                    y = (y*y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += block_size
+            r *= 2
+
+        if g == n:
+            # Backtrack through the collapsed block one gcd at a time
+            g = 1
+            while g == 1:
+                block_start = (block_start*block_start + c) % n
+                g = gcd(abs(x - block_start), n)
+
+        if g != n:
+            return g
+        c, y = random.randrange(1, n - 2), random.randrange(0, n)  # new polynomial and seed (c = n-2, i.e. x*x - 2, is degenerate)
+    return None
+
+# Which residues mod m can be squares. Checking b2 against these rejects
+# about 99% of non-squares before the (much more expensive) isqrt.
+SQUARE_FILTER_MOD_64 = bytes(1 if any(x*x % 64 == r for x in range(64)) else 0 for r in range(64))
+SQUARE_FILTER_MODULUS = 63 * 65 * 11
+_SQUARES_MOD_63, _SQUARES_MOD_65, _SQUARES_MOD_11 = ({x*x % m for x in range(m)} for m in (63, 65, 11))
+SQUARE_FILTER_MOD_45045 = bytes(
+    1 if r % 63 in _SQUARES_MOD_63 and r % 65 in _SQUARES_MOD_65 and r % 11 in _SQUARES_MOD_11 else 0
+    for r in range(SQUARE_FILTER_MODULUS)
+)
 
 def fermat_factor(n, max_iter=100000):
-    a = int(n ** 0.5) + 1
+    """
+    Fermat's method: find a with a*a - n = b*b, then n = (a - b)(a + b).
+
+    - Exact integer arithmetic throughout (math.isqrt, no floats), so it is
+      correct for moduli of any size
+    - a steps up incrementally: b2 += 2a + 1, using additions only
+    - b2 is only passed to isqrt when it is a square modulo 64, 63, 65 and 11
+    Fast when p and q are close to sqrt(n); returns None after max_iter steps.
+    """
+    if n < 4:
+        return None  # 1, 2 and 3 have no non-trivial factor
+    if n % 2 == 0:
+        return 2
+    a = math.isqrt(n)
+    if a * a == n:
+        return a
+    a += 1
     b2 = a*a - n
-    count = 0
-    while count < max_iter and not int(b2**0.5 + 0.5)**2 == b2:
+    increment = 2*a + 1  # (a+1)^2 - a^2
+    for _ in range(max_iter + 1):
+        if SQUARE_FILTER_MOD_64[b2 & 63] and SQUARE_FILTER_MOD_45045[b2 % SQUARE_FILTER_MODULUS]:
+            b = math.isqrt(b2)
+            if b * b == b2:
+                factor = a - b
+                return factor if factor > 1 else None
+        b2 += increment
+        increment += 2
         a += 1
-        b2 = a*a - n
-        count += 1
-    if int(b2**0.5 + 0.5)**2 == b2:
-        b = int(b2**0.5)
-        return a - b
     return None
 
 def gcd(a, b):
@@ -52,45 +234,59 @@ def gcd(a, b):
     return a
 
 # ----- Run Benchmarks -----
-results = []
-
-for p, q in prime_pairs:
-    n = p * q
-    print(f"\nTesting p={p}, q={q}")
-    print(f"n={n} (bitlen={n.bit_length()})")
-
-    row = {"p": p, "q": q, "n": n, "bits": n.bit_length()}
-
-    # Sympy
-    start = time.time()
-    factors = factorint(n)
-    row["sympy_time"] = round(time.time() - start, 4)
-    print(" sympy:", factors, "time:", row["sympy_time"], "s")
-
-    # Trial
-    start = time.time()
-    f = trial_division(n)
-    row["trial_time"] = round(time.time() - start, 4)
-    print(" trial:", f, "time:", row["trial_time"], "s")
-
-    # Pollard
-    start = time.time()
-    f = pollards_rho(n)
-    row["pollard_time"] = round(time.time() - start, 4)
-    print(" pollard:", f, "time:", row["pollard_time"], "s")
-
-    # Fermat
-    start = time.time()
-    f = fermat_factor(n)
-    row["fermat_time"] = round(time.time() - start, 4)
-    print(" fermat:", f, "time:", row["fermat_time"], "s")
-
-    results.append(row)
-
-# ----- Save to CSV -----
-with open("factor_benchmark_results.csv", "w", newline="") as f:
-    writer = csv.DictWriter(f, fieldnames=results[0].keys())
-    writer.writeheader()
-    writer.writerows(results)
-
-print("\n✅ Results written to factor_benchmark_results.csv")
+# (guarded so worker processes can import this file without re-running it)
+if __name__ == "__main__":
+    results = []
+
+    for p, q in prime_pairs:
+        n = p * q
+        print(f"\nTesting p={p}, q={q}")
+        print(f"n={n} (bitlen={n.bit_length()})")
+
+        row = {"p": p, "q": q, "n": n, "bits": n.bit_length()}
+
+        # Sympy
+        start = time.time()
+        factors = factorint(n)
+        row["sympy_time"] = round(time.time() - start, 4)
+        print(" sympy:", factors, "time:", row["sympy_time"], "s")
+
+        # Trial
+        start = time.time()
+        f = trial_division(n)
+        row["trial_time"] = round(time.time() - start, 4)
+        print(" trial:", f, "time:", row["trial_time"], "s")
+
+        # Pollard
+        start = time.time()
+        f = pollards_rho(n)
+        row["pollard_time"] = round(time.time() - start, 4)
+        print(" pollard:", f, "time:", row["pollard_time"], "s")
+
+        # Fermat
+        start = time.time()
+        f = fermat_factor(n)
+        row["fermat_time"] = round(time.time() - start, 4)
+        print(" fermat:", f, "time:", row["fermat_time"], "s")
+
+        # ECM (curves run in parallel across cores)
+        start = time.time()
+        f = ecm_factor(n)
+        row["ecm_time"] = round(time.time() - start, 4)
+        print(" ecm:", f, "time:", row["ecm_time"], "s")
+
+        # Quadratic sieve (SIQS)
+        start = time.time()
+        f = siqs_factor(n)
+        row["siqs_time"] = round(time.time() - start, 4)
+        print(" siqs:", f, "time:", row["siqs_time"], "s")
+
+        results.append(row)
+
+    # ----- Save to CSV -----
+    with open("factor_benchmark_results.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=results[0].keys())
+        writer.writeheader()
+        writer.writerows(results)
+
+    print("\n✅ Results written to factor_benchmark_results.csv")
@@ -0,0 +1,205 @@
+"""
+hack_scan.py
+Cross-platform Python version of run_hack_auto_scan.ps1: runs the hack binary
+once per key/cipher pair, samples its CPU and memory, and appends the results
+to a CSV in the VMresults.csv format.
+
+What it does (same as the PowerShell script):
+- Finds every key_*.txt in the test folder with a matching cipher_*.txt
+- Copies them next to the hack binary as key.txt / cipher.txt and runs it
+- Samples the process every SAMPLE_INTERVAL_MS and records elapsed time,
+  peak CPU % (of all logical CPUs) and peak resident memory (kB)
+- Appends case_name,start_time,elapsed_s,peak_cpu_pct,peak_mem_kb rows
+
+Differences:
+- Runs on Linux too: samples /proc/<pid>/stat and /proc/<pid>/status, or psutil
+  when it is installed (needed on Windows and macOS)
+- The number of logical CPUs is read once, not on every sample
+- Several cases can run at once (up to cpu_budget). Each case gets its own
+  scratch copy of the hack folder, so the parallel runs never overwrite each
+  other's key.txt / cipher.txt
+- The sampling interval and the number of parallel cases can be set from the
+  command line: python hack_scan.py [hack] [cases] [csv] --interval-ms 100 --cpu-budget 4
+
+References:
+- proc(5) manual page (/proc/<pid>/stat utime/stime, /proc/<pid>/status VmRSS):
+  https://man7.org/linux/man-pages/man5/proc.5.html
+- psutil documentation: https://psutil.readthedocs.io/
+"""
+
+import argparse
+import csv
+import datetime
+import glob
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psutil  # optional, used instead of /proc when installed
+except ImportError:
+    psutil = None
+
+BASE = os.path.dirname(os.path.abspath(__file__))
+
+# ----- Configuration (the PowerShell script's parameters) -----
+HACK_FOLDER = os.path.join(BASE, "hack")
+HACK_BINARY = "Hack.exe" if os.name == "nt" else "Hack"
+TEST_FOLDER = os.path.join(BASE, "cipher_cases")
+CSV_OUTPUT = os.path.join(BASE, "VMresults.csv")
+SAMPLE_INTERVAL_MS = 200
+CPU_BUDGET = 1          # cases run at the same time (1 = one after another, like the .ps1)
+
+CSV_FIELDS = ["case_name", "start_time", "elapsed_s", "peak_cpu_pct", "peak_mem_kb"]
+LOGICAL_CPUS = os.cpu_count() or 1
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+# ----- Sampling -----
+def _sample_proc(pid):
+    """(CPU seconds used, resident memory in kB) from /proc, or None once the process is gone."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/status") as f:
+            status = f.read()
+    except (FileNotFoundError, ProcessLookupError):
+        return None
+    fields = stat[stat.rindex(")") + 2:].split()  # the command name may contain spaces
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime + stime
+    rss_kb = next((int(line.split()[1]) for line in status.splitlines() if line.startswith("VmRSS:")), 0)
+    return cpu_seconds, rss_kb
+
+
+def _sample_psutil(pid):
+    try:
+        process = psutil.Process(pid)
+        cpu = process.cpu_times()
+        return cpu.user + cpu.system, process.memory_info().rss // 1024
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return None
+
+
+sample_process = _sample_psutil if psutil is not None else _sample_proc
+
+
+def run_and_sample(command, cwd, sample_interval_ms=SAMPLE_INTERVAL_MS):
+    """
+    Run command in cwd until it exits, sampling it every sample_interval_ms.
+    Returns (start datetime, elapsed seconds, peak CPU %, peak memory kB).
+    CPU % is the share of all logical CPUs, as in the PowerShell script.
+    """
+    start_time = datetime.datetime.now().astimezone()
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    peak_cpu, peak_mem = 0.0, 0
+    previous = (0.0, started)
+    while process.poll() is None:
+        time.sleep(sample_interval_ms / 1000)
+        sample = sample_process(process.pid)
+        now = time.perf_counter()
+        if sample is None:
+            continue
+        cpu_seconds, rss_kb = sample
+        peak_mem = max(peak_mem, rss_kb)
+        if now > previous[1]:
+            cpu_pct = (cpu_seconds - previous[0]) / (now - previous[1]) * 100 / LOGICAL_CPUS
+            peak_cpu = max(peak_cpu, cpu_pct)
+        previous = (cpu_seconds, now)
+    return start_time, time.perf_counter() - started, peak_cpu, peak_mem
+
+
+# ----- Cases -----
+def find_cases(test_folder=TEST_FOLDER):
+    """(case name, key path, cipher path) for every key_*.txt that has a matching cipher_*.txt."""
+    cases = []
+    for key_path in sorted(glob.glob(os.path.join(test_folder, "key_*.txt"))):
+        key_name = os.path.basename(key_path)
+        cipher_path = os.path.join(test_folder, "cipher_" + key_name[len("key_"):])
+        if not os.path.exists(cipher_path):
+            print(f"WARNING: Skipping {key_name} because matching cipher file not found.")
+            continue
+        cases.append((os.path.splitext(key_name)[0], key_path, cipher_path))
+    return cases
+
+
+def run_case(case, hack_folder=HACK_FOLDER, hack_binary=HACK_BINARY, sample_interval_ms=SAMPLE_INTERVAL_MS):
+    """Run one case in a scratch copy of the hack folder and return its CSV row."""
+    case_name, key_path, cipher_path = case
+    scratch = tempfile.mkdtemp(prefix=f"{case_name}_")
+    try:
+        work_folder = os.path.join(scratch, "hack")
+        shutil.copytree(hack_folder, work_folder)
+        shutil.copyfile(key_path, os.path.join(work_folder, "key.txt"))
+        shutil.copyfile(cipher_path, os.path.join(work_folder, "cipher.txt"))
+
+        print(f"\n=== Running test: {case_name} ===")
+        start_time, elapsed, peak_cpu, peak_mem = run_and_sample(
+            [os.path.join(work_folder, hack_binary)], work_folder, sample_interval_ms)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"Test {case_name} completed. Elapsed(s): {elapsed:.3f}, PeakCPU: {peak_cpu:.2f}, PeakMem: {peak_mem} kB")
+    return {
+        "case_name": case_name,
+        "start_time": start_time.isoformat(),
+        "elapsed_s": f"{elapsed:.3f}",
+        "peak_cpu_pct": f"{peak_cpu:.2f}",
+        "peak_mem_kb": peak_mem,
+    }
+
+
+def _end_with_newline(path):
+    """Add a newline to a non-empty file that lacks one (VMresults.csv ends without), so appended rows start on their own line."""
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+
+def run_all(hack_folder=HACK_FOLDER, test_folder=TEST_FOLDER, csv_output=CSV_OUTPUT,
+            sample_interval_ms=SAMPLE_INTERVAL_MS, cpu_budget=CPU_BUDGET, hack_binary=HACK_BINARY):
+    """Run every case, at most cpu_budget at a time, appending each row to csv_output as it finishes."""
+    if not os.path.exists(csv_output):
+        with open(csv_output, "w", newline="") as f:
+            csv.DictWriter(f, fieldnames=CSV_FIELDS, lineterminator="\n").writeheader()
+    else:
+        _end_with_newline(csv_output)
+    csv_lock = threading.Lock()
+
+    def run_and_record(case):
+        row = run_case(case, hack_folder, hack_binary, sample_interval_ms)
+        with csv_lock, open(csv_output, "a", newline="") as f:
+            csv.DictWriter(f, fieldnames=CSV_FIELDS, lineterminator="\n").writerow(row)
+        return row
+
+    with ThreadPoolExecutor(max_workers=max(1, cpu_budget)) as pool:
+        rows = list(pool.map(run_and_record, find_cases(test_folder)))
+    print(f"\nAll tests finished. CSV updated at {csv_output}")
+    return rows
+
+
+if __name__ == "__main__":
+    # Positional arguments in the .ps1 parameter order (hack folder, test folder, CSV output), all optional
+    parser = argparse.ArgumentParser(description="Run the hack binary on every key/cipher pair and record CPU and memory.")
+    parser.add_argument("hack_folder", nargs="?", default=HACK_FOLDER)
+    parser.add_argument("test_folder", nargs="?", default=TEST_FOLDER)
+    parser.add_argument("csv_output", nargs="?", default=CSV_OUTPUT)
+    parser.add_argument("--interval-ms", type=int, default=SAMPLE_INTERVAL_MS,
+                        help=f"sampling interval in milliseconds (default {SAMPLE_INTERVAL_MS})")
+    parser.add_argument("--cpu-budget", type=int, default=CPU_BUDGET,
+                        help=f"cases run at the same time (default {CPU_BUDGET})")
+    arguments = parser.parse_args()
+    run_all(hack_folder=arguments.hack_folder,
+            test_folder=arguments.test_folder,
+            csv_output=arguments.csv_output,
+            sample_interval_ms=arguments.interval_ms,
+            cpu_budget=arguments.cpu_budget)
@@ -1,4 +1,4 @@
-# from sympy import prevprime, nextprime
+# from sieve import prev_prime as prevprime, next_prime as nextprime  # (was sympy)
 
 # # Replace this with your concatenated ID
 # concatenated_id = 4101575
@@ -16,15 +16,20 @@
 # print(f"Prime below: {prime_below} (distance: {distance_below})")
 # print(f"Prime above: {prime_above} (distance: {distance_above})")
 
-from sympy import isprime
+import os
+import sys
+
+# primegen.py lives one folder up in assignment2/
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE))
+import primegen as pg
 
 n = 4101575
 range_width = 10000
 
 print(f"Primes around {n} (±{range_width}):")
-for i in range(n - range_width, n + range_width + 1):
-    if isprime(i):
-        print(i)
+for i in pg.primes_in_range(n - range_width, n + range_width + 1):
+    print(i)
 
 """
 
@@ -0,0 +1,42 @@
+"""
+modexp_benchmark.py
+Times each modular exponentiation backend in primegen.py at RSA-sized moduli
+and reports the speedup over the original square-and-multiply loop.
+"""
+
+import os
+import sys
+import random
+import time
+
+# primegen.py lives one folder up in assignment2/
+BASE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BASE))
+import primegen as pg
+
+# ----- Configuration -----
+BIT_SIZES = [512, 1024, 2048]
+REPEATS = 5  # full-size exponentiations per backend and size (best time is kept)
+
+for bits in BIT_SIZES:
+    random.seed(bits)
+    modulus = random.getrandbits(bits) | (1 << (bits - 1)) | 1  # odd, like an RSA modulus
+    base = random.getrandbits(bits) % modulus
+    exponent = random.getrandbits(bits) | (1 << (bits - 1))     # full-size private-style exponent
+    expected = pow(base, exponent, modulus)
+
+    print(f"\n{bits}-bit modulus")
+    timings = {}
+    for name, backend in pg.EXPONENTIATION_BACKENDS.items():
+        best = float("inf")
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            value = backend(base, exponent, modulus)
+            best = min(best, time.perf_counter() - start)
+        if value != expected:
+            raise AssertionError(f"{name} returned a wrong result at {bits} bits")
+        timings[name] = best
+
+    for name, best in timings.items():
+        speedup = timings["square_and_multiply"] / best
+        print(f" {name:<20} {best * 1000:9.3f} ms   x{speedup:.2f}")
@@ -10,11 +10,17 @@ import math
 # ----- Load CSV Data -----
 filename = "factor_benchmark_results.csv"  # update path if needed
 
-prime_gaps = []
-sympy_time = []
-trial_time = []
-pollard_time = []
-fermat_time = []
+# (column, marker, label); each method keeps its own gap list because the
+# benchmark harness leaves timed-out cells empty
+METHODS = [
+    ("sympy_time", "o-", "Sympy (factorint)"),
+    ("trial_time", "s-", "Trial Division"),
+    ("pollard_time", "^-", "Pollard’s Rho"),
+    ("fermat_time", "d-", "Fermat Factorization"),
+    ("ecm_time", "x-", "ECM (elliptic curves)"),
+    ("siqs_time", "v-", "Quadratic Sieve (SIQS)"),
+]
+series = {column: ([], []) for column, _, _ in METHODS}
 
 with open(filename, newline="") as f:
     reader = csv.DictReader(f)
@@ -22,19 +28,18 @@ with open(filename, newline="") as f:
         p = int(row["p"])
         q = int(row["q"])
         gap = abs(q - p)
-        prime_gaps.append(gap)
-        sympy_time.append(float(row["sympy_time"]))
-        trial_time.append(float(row["trial_time"]))
-        pollard_time.append(float(row["pollard_time"]))
-        fermat_time.append(float(row["fermat_time"]))
+        for column, _, _ in METHODS:
+            if row.get(column):  # older result files have no ECM/SIQS columns
+                series[column][0].append(gap)
+                series[column][1].append(float(row[column]))
 
 # ----- Plot Results -----
 plt.figure(figsize=(8, 5))
 
-plt.plot(prime_gaps, sympy_time, "o-", label="Sympy (factorint)")
-plt.plot(prime_gaps, trial_time, "s-", label="Trial Division")
-plt.plot(prime_gaps, pollard_time, "^-", label="Pollard’s Rho")
-plt.plot(prime_gaps, fermat_time, "d-", label="Fermat Factorization")
+for column, marker, label in METHODS:
+    prime_gaps, times = series[column]
+    if times:
+        plt.plot(prime_gaps, times, marker, label=label)
 
 plt.xscale("log")
 plt.yscale("log")
@@ -0,0 +1,378 @@
+"""
+siqs.py
+Self-initialising multiple-polynomial quadratic sieve (SIQS) for the balanced
+("close primes") moduli in factor_benchmark.py, in Python + NumPy.
+
+Why a quadratic sieve:
+- Trial division, rho and ECM all get slower as the smallest factor grows,
+  so balanced semiprimes (p ≈ q) are their worst case
+- The QS running time depends only on the size of n, and is sub-exponential
+
+Method:
+1. Factor base: primes p below a bound with n a square mod p (Legendre symbol = 1),
+   plus the square roots t_p of n mod p (Tonelli-Shanks)
+2. Polynomials: Q(x) = (A*x + B)^2 - n = A * g(x), where A is a product of s
+   factor-base primes chosen so that |g(x)| stays small on [-M, M).
+   Each A gives 2^(s-1) different B values; switching between them (Gray code)
+   only needs additions to the sieve roots - the "self-initialising" part
+3. Sieve: add round(log2 p) at every x where p divides g(x) (two arithmetic
+   progressions per prime, each one NumPy slice addition), then fully
+   trial-divide only the x whose total is above a threshold
+4. Large-prime variation: keep relations with one leftover prime below
+   LARGE_PRIME_MULTIPLIER * (largest factor-base prime); two of them with the
+   same leftover prime combine into one full relation
+5. Gaussian elimination over GF(2) (rows packed into Python ints) finds subsets
+   of relations whose product is a square, X^2 ≡ Y^2 (mod n), and gcd(X - Y, n)
+   gives the factor
+
+References:
+1. Contini, S. (1997). "Factoring Integers with the Self-Initializing Quadratic Sieve".
+   MSc thesis, University of Georgia.
+2. Crandall & Pomerance, "Prime Numbers: A Computational Perspective", 2nd ed., Section 6.1
+3. Tonelli-Shanks algorithm (Wikipedia): https://en.wikipedia.org/wiki/Tonelli%E2%80%93Shanks_algorithm
+"""
+
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# primegen.py lives one folder up in assignment2/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import primegen as pg
+
+# (maximum bits of n, factor base size, sieve half-width M)
+SIQS_PARAMETERS = [
+    (50, 50, 1024),
+    (60, 60, 4096),
+    (80, 120, 8192),
+    (100, 220, 16384),
+    (120, 400, 32768),
+    (140, 750, 32768),
+    (160, 1300, 65536),
+    (180, 2200, 65536),
+    (200, 3200, 98304),
+    (230, 5000, 131072),
+]
+SMALL_PRIME_CUTOFF = 30        # primes below this are not sieved (cheap to skip, little log weight)
+THRESHOLD_SLACK = 2.0          # sieve threshold = log2(max |g(x)|) - THRESHOLD_SLACK * log2(largest prime)
+LARGE_PRIME_MULTIPLIER = 64    # single large primes up to this times the largest factor-base prime
+EXTRA_RELATIONS = 10           # relations beyond the matrix width, so several dependencies exist
+SLICED_HITS = 128              # primes hitting the interval more often than this are sieved with slices,
+                               # the rest all at once with one np.bincount
+
+
+def sqrt_mod_prime(a, p):
+    """Tonelli-Shanks: return t with t*t ≡ a (mod p), for an odd prime p and a quadratic residue a."""
+    a %= p
+    if a == 0:
+        return 0
+    if p % 4 == 3:
+        return pow(a, (p + 1) // 4, p)
+    q, s = p - 1, 0
+    while q % 2 == 0:
+        q //= 2
+        s += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:  # any quadratic non-residue
+        z += 1
+    m, c, t, r = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+    while t != 1:
+        i, t_squared = 0, t
+        while t_squared != 1:
+            t_squared = t_squared * t_squared % p
+            i += 1
+        b = pow(c, 1 << (m - i - 1), p)
+        m, c, t, r = i, b * b % p, t * b * b % p, r * b % p
+    return r
+
+
+def _parameters_for(n):
+    bits = n.bit_length()
+    for max_bits, factor_base_size, half_width in SIQS_PARAMETERS:
+        if bits <= max_bits:
+            return factor_base_size, half_width
+    return SIQS_PARAMETERS[-1][1:]
+
+
+class _FactorFound(Exception):
+    def __init__(self, factor):
+        super().__init__(factor)
+        self.factor = factor
+
+
+def _build_factor_base(n, size):
+    """Primes p (2 first) with n a square mod p, and their roots. Raises _FactorFound if p | n."""
+    primes, roots = [2], [n % 2]
+    limit = 1000
+    while len(primes) < size:
+        for p in pg.small_primes_below(limit)[1:]:
+            if p <= primes[-1]:
+                continue
+            if n % p == 0:
+                raise _FactorFound(p)
+            if pg.jacobi_symbol(n, p) == 1:
+                primes.append(p)
+                roots.append(sqrt_mod_prime(n, p))
+                if len(primes) == size:
+                    break
+        limit *= 2
+    return primes, roots
+
+
+class _PolynomialFamily:
+    """One A = q_1 * ... * q_s and its 2^(s-1) polynomials g(x) = A x^2 + 2 B x + C."""
+
+    def __init__(self, n, A, a_indices, primes, roots, prime_array, root_array):
+        self.n = n
+        self.A = A
+        self.a_indices = set(a_indices)
+
+        # B_l ≡ t_l (mod q_l) and ≡ 0 (mod q_j, j != l), so (sum ±B_l)^2 ≡ n (mod A)
+        self.B_terms = []
+        for index in a_indices:
+            q = primes[index]
+            a_over_q = A // q
+            gamma = roots[index] * pg.mod_inverse(a_over_q % q, q) % q
+            if gamma > q // 2:
+                gamma = q - gamma
+            self.B_terms.append(a_over_q * gamma)
+        self.signs = [1] * len(self.B_terms)
+        self.B = sum(self.B_terms)
+
+        # A^-1 mod p for every factor-base prime (0 where p divides A, those are not sieved)
+        self.sievable = np.array([i not in self.a_indices for i in range(len(primes))])
+        self.a_inverse = np.array([pg.mod_inverse(A % p, p) if (i not in self.a_indices and p > 2) else 0
+                                   for i, p in enumerate(primes)], dtype=np.int64)
+        self.B_mod_p = np.array([self.B % p for p in primes], dtype=np.int64)
+        self.B_terms_mod_p = [np.array([b % p for p in primes], dtype=np.int64) for b in self.B_terms]
+        self.prime_array = prime_array
+        self.root_array = root_array
+
+    def polynomial_count(self):
+        return 1 << (len(self.B_terms) - 1)
+
+    def switch(self, index):
+        """Move to polynomial number 'index' (Gray code: flip the sign of a single B_v)."""
+        v = (index & -index).bit_length() - 1
+        self.signs[v] = -self.signs[v]
+        self.B += 2 * self.signs[v] * self.B_terms[v]
+        self.B_mod_p = (self.B_mod_p + 2 * self.signs[v] * self.B_terms_mod_p[v]) % self.prime_array
+
+    def sieve_roots(self):
+        """x mod p where p | g(x): A^-1 (±t_p - B) mod p."""
+        p = self.prime_array
+        root_one = self.a_inverse * ((self.root_array - self.B_mod_p) % p) % p
+        root_two = self.a_inverse * ((-self.root_array - self.B_mod_p) % p) % p
+        return root_one, root_two
+
+
+def _choose_A(n, primes, half_width, rng, used):
+    """Pick s factor-base primes whose product is close to sqrt(2n)/M (and not used before)."""
+    target = math.isqrt(2 * n) // half_width
+    candidates = [i for i, p in enumerate(primes) if p >= SMALL_PRIME_CUTOFF]
+    ideal_q = min(2000, primes[candidates[len(candidates) * 2 // 3]])
+    s = max(1, round(math.log(max(target, 2)) / math.log(ideal_q)))
+
+    for attempt in range(1000):
+        if attempt and attempt % 200 == 0:
+            s += 1  # small n: few primes lie near the target, so spread A over more of them
+        q_size = target ** (1.0 / s)
+        pool = [i for i in candidates if q_size / 2 <= primes[i] <= q_size * 2] or candidates
+        chosen = rng.sample(pool, min(s - 1, len(pool) - 1)) if s > 1 else []
+        rest = target // math.prod(primes[i] for i in chosen) if chosen else target
+        # Last prime: the unused candidate closest to what is left of the target
+        last = min((i for i in candidates if i not in chosen),
+                   key=lambda i: abs(primes[i] - rest) + rng.random())
+        key = frozenset(chosen + [last])
+        if key not in used:
+            used.add(key)
+            return math.prod(primes[i] for i in key), sorted(key)
+    raise RuntimeError("Ran out of new A values; increase the factor base size.")
+
+
+def _factor_over_base(value, x, root_one, root_two, family, primes):
+    """Exponent dict {column: exponent} of value over [-1] + factor base, and the leftover cofactor."""
+    exponents = {}
+    if value < 0:
+        exponents[0] = 1
+        value = -value
+    # Which primes divide g(x): x matches one of the two sieve roots (or divides A / is 2 - check directly)
+    x_mod_p = x % family.prime_array
+    hits = np.flatnonzero(((x_mod_p == root_one) | (x_mod_p == root_two)) & family.sievable)
+    indices = set(hits.tolist()) | family.a_indices | {0}
+    for index in sorted(indices):
+        p = primes[index]
+        count = 0
+        while value % p == 0:
+            value //= p
+            count += 1
+        if count:
+            exponents[index + 1] = exponents.get(index + 1, 0) + count
+    # Q(x) = A * g(x): add one of each prime in A
+    for index in family.a_indices:
+        exponents[index + 1] = exponents.get(index + 1, 0) + 1
+    return exponents, value
+
+
+def _find_dependencies(relations):
+    """Gaussian elimination over GF(2); returns subsets (as bitmasks over relations) with a square product."""
+    pivots = {}
+    dependencies = []
+    for i, (_, exponents, _) in enumerate(relations):
+        row = 0
+        for column, exponent in exponents.items():
+            if exponent & 1:
+                row |= 1 << column
+        history = 1 << i
+        while row:
+            column = row.bit_length() - 1
+            if column not in pivots:
+                pivots[column] = (row, history)
+                break
+            pivot_row, pivot_history = pivots[column]
+            row ^= pivot_row
+            history ^= pivot_history
+        if row == 0:
+            dependencies.append(history)
+    return dependencies
+
+
+def _square_root_factor(n, relations, dependency, primes):
+    """Combine the relations in 'dependency' into X^2 ≡ Y^2 (mod n) and try gcd(X - Y, n)."""
+    x_value, y_value = 1, 1
+    total = {}
+    for i, (y_i, exponents, extra) in enumerate(relations):
+        if dependency >> i & 1:
+            x_value = x_value * y_i % n
+            y_value = y_value * extra % n
+            for column, exponent in exponents.items():
+                total[column] = total.get(column, 0) + exponent
+    for column, exponent in total.items():
+        if column > 0:
+            y_value = y_value * pow(primes[column - 1], exponent // 2, n) % n
+    g = math.gcd(x_value - y_value, n)
+    return g if 1 < g < n else None
+
+
+def siqs_factor(n, factor_base_size=None, half_width=None, max_seconds=None, seed=None, verbose=False):
+    """
+    Find a non-trivial factor of n with the self-initialising quadratic sieve, or return None.
+
+    - factor_base_size, half_width: override the SIQS_PARAMETERS for n's size
+    - max_seconds: give up (return None) after this long
+    - seed: seed for the random choice of A values
+    Best for 100-200-bit n with no small factors; call a cheaper method first for those.
+    """
+    if n % 2 == 0:
+        return 2 if n > 2 else None
+    root = math.isqrt(n)
+    if root * root == n:
+        return root
+    if n < 4 or pg.is_probable_prime(n):
+        return None
+
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    default_size, default_width = _parameters_for(n)
+    factor_base_size = factor_base_size or default_size
+    half_width = half_width or default_width
+
+    try:
+        primes, roots = _build_factor_base(n, factor_base_size)
+    except _FactorFound as found:
+        return found.factor
+    prime_array = np.array(primes, dtype=np.int64)
+    root_array = np.array(roots, dtype=np.int64)
+    logs = [round(math.log2(p)) for p in primes]
+    sieve_start = next(i for i, p in enumerate(primes) if p >= SMALL_PRIME_CUTOFF)
+    # Split point between slice-sieved primes and the bincount-sieved large ones
+    bulk_start = next((i for i, p in enumerate(primes) if p * SLICED_HITS >= 2 * half_width), len(primes))
+    bulk_start = max(bulk_start, sieve_start)
+    # Large primes are grouped by size (p in [p0, 2*p0)) so each group needs only ~2M/p0 steps per root
+    bulk_groups = []  # (first index, end index, offsets p*k for k = 0..hits, log weights)
+    group_start = bulk_start
+    while group_start < len(primes):
+        group_end = next((i for i in range(group_start, len(primes)) if primes[i] >= 2 * primes[group_start]),
+                         len(primes))
+        group_primes = prime_array[group_start:group_end, None]
+        steps = group_primes * np.arange((2 * half_width) // primes[group_start] + 1)
+        weights = np.repeat(np.array(logs[group_start:group_end], dtype=np.float64)[:, None], steps.shape[1], axis=1)
+        bulk_groups.append((group_start, group_end, steps, weights))
+        group_start = group_end
+    largest_prime = primes[-1]
+    large_prime_bound = min(largest_prime * LARGE_PRIME_MULTIPLIER, largest_prime * largest_prime)
+    threshold = int(math.log2(half_width * math.isqrt(n // 2)) - THRESHOLD_SLACK * math.log2(largest_prime))
+
+    needed = len(primes) + 1 + EXTRA_RELATIONS  # columns: sign + factor base
+    relations = []      # (Y, exponents, extra square-root factor)
+    partials = {}       # large prime -> (Y, exponents)
+    used_A = set()
+    offsets = np.arange(-half_width, half_width, dtype=np.int64)
+
+    while True:
+        while len(relations) < needed:
+            if max_seconds is not None and time.perf_counter() - started > max_seconds:
+                return None
+            A, a_indices = _choose_A(n, primes, half_width, rng, used_A)
+            family = _PolynomialFamily(n, A, a_indices, primes, roots, prime_array, root_array)
+            # Primes dividing A are not sieved: give them weight 0
+            bulk_weights = np.concatenate([(family.sievable[start:end, None] * weights).ravel()
+                                           for start, end, _, weights in bulk_groups] * 2) if bulk_groups else None
+            for polynomial_index in range(family.polynomial_count()):
+                if polynomial_index:
+                    family.switch(polynomial_index)
+                B = family.B
+                C = (B * B - n) // A
+                root_one, root_two = family.sieve_roots()
+
+                # Sieve [-M, M): two slice additions per smaller prime...
+                sieve = np.zeros(2 * half_width, dtype=np.uint16)
+                first_one = (root_one + half_width) % prime_array
+                first_two = (root_two + half_width) % prime_array
+                r1_list, r2_list = first_one.tolist(), first_two.tolist()
+                for i in range(sieve_start, bulk_start):
+                    if i in family.a_indices:
+                        continue
+                    p, log_p = primes[i], logs[i]
+                    sieve[r1_list[i]::p] += log_p
+                    sieve[r2_list[i]::p] += log_p
+                # ...and every hit of the larger primes (only a few each) in one bincount
+                if bulk_groups:
+                    positions = np.concatenate([(first[start:end, None] + steps).ravel()
+                                                for first in (first_one, first_two)
+                                                for start, end, steps, _ in bulk_groups])
+                    in_range = positions < 2 * half_width
+                    sieve += np.bincount(positions[in_range], weights=bulk_weights[in_range],
+                                         minlength=2 * half_width).astype(np.uint16)
+
+                for x in offsets[np.flatnonzero(sieve >= threshold)].tolist():
+                    g_value = (A * x + 2 * B) * x + C
+                    if g_value == 0:
+                        continue
+                    exponents, cofactor = _factor_over_base(g_value, x, root_one, root_two, family, primes)
+                    y_value = A * x + B
+                    if cofactor == 1:
+                        relations.append((y_value, exponents, 1))
+                    elif cofactor < large_prime_bound:
+                        if cofactor in partials:  # two partials with the same large prime make a full relation
+                            other_y, other_exponents = partials.pop(cofactor)
+                            combined = dict(other_exponents)
+                            for column, exponent in exponents.items():
+                                combined[column] = combined.get(column, 0) + exponent
+                            relations.append((y_value * other_y % n, combined, cofactor))
+                        else:
+                            partials[cofactor] = (y_value, exponents)
+
+            if verbose:
+                print(f" siqs: {len(relations)}/{needed} relations, {len(partials)} partials,"
+                      f" {time.perf_counter() - started:.1f} s")
+
+        for dependency in _find_dependencies(relations):
+            factor = _square_root_factor(n, relations, dependency, primes)
+            if factor:
+                return factor
+        needed += EXTRA_RELATIONS  # every dependency was trivial; collect a few more relations